@@ -0,0 +1,124 @@
+"""
+Group Aggregation Benchmark
+===========================
+Times the pandas groupby + merge chain behind IFI, CLCR and the lifecycle
+gap against the factorized bincount engine in src/groupsum.py, on
+synthetic frames shaped like the UIDAI datasets, and checks that both give
+the same numbers.
+
+Usage:
+    python scripts/benchmark_groupsum.py [n_rows]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import numpy as np
+
+from src.groupsum import GroupCodes
+
+
+N_STATES = 36
+DISTRICTS_PER_STATE = 20
+REPEATS = 3
+
+
+def make_frame(n_rows: int, columns: list, seed: int) -> pd.DataFrame:
+    """Synthetic typed frame with categorical state/district keys and uint8 counts."""
+    rng = np.random.default_rng(seed)
+    state = rng.integers(0, N_STATES, n_rows)
+    district = state * DISTRICTS_PER_STATE + rng.integers(0, DISTRICTS_PER_STATE, n_rows)
+    df = pd.DataFrame({
+        'state': pd.Categorical.from_codes(state, [f'State {i:02d}' for i in range(N_STATES)]),
+        'district': pd.Categorical.from_codes(
+            district, [f'District {i:04d}' for i in range(N_STATES * DISTRICTS_PER_STATE)]
+        ),
+    })
+    for col in columns:
+        df[col] = rng.integers(0, 50, n_rows).astype(np.uint8)
+    return df
+
+
+def pandas_chain(enrol, demo, bio, keys):
+    """IFI, CLCR and lifecycle sums built with one groupby + merge per input."""
+    enrol_agg = enrol.groupby(keys, observed=True)['total_enrolments'].sum().reset_index()
+    demo_agg = demo.groupby(keys, observed=True)['total_demo_updates'].sum().reset_index()
+    bio_agg = bio.groupby(keys, observed=True)['total_bio_updates'].sum().reset_index()
+    result = enrol_agg.merge(demo_agg, on=keys, how='left')
+    result = result.merge(bio_agg, on=keys, how='left').fillna(0)
+
+    enrol_child = enrol.groupby(keys, observed=True)[['age_5_17', 'age_18_greater']].sum().reset_index()
+    bio_child = bio.groupby(keys, observed=True)[['bio_age_5_17', 'bio_age_17_']].sum().reset_index()
+    result = result.merge(enrol_child, on=keys, how='left')
+    result = result.merge(bio_child, on=keys, how='left').fillna(0)
+
+    result['ifi'] = (result['total_demo_updates'] + result['total_bio_updates']) / result['total_enrolments']
+    result['clcr'] = result['bio_age_5_17'] / (result['age_5_17'] * 0.20)
+    result['lifecycle_gap'] = (
+        result['age_5_17'] / (result['age_5_17'] + result['age_18_greater']) -
+        result['bio_age_5_17'] / (result['bio_age_5_17'] + result['bio_age_17_'])
+    )
+    return result
+
+
+def bincount_engine(enrol, demo, bio, keys):
+    """The same table from one shared factorization and position-aligned sums."""
+    groups = GroupCodes([enrol, demo, bio], keys)
+    base = groups.present(0)
+    result = groups.keys()[base].reset_index(drop=True)
+
+    enrol_sums = groups.sum(0, ['total_enrolments', 'age_5_17', 'age_18_greater'])[base]
+    bio_sums = groups.sum(2, ['total_bio_updates', 'bio_age_5_17', 'bio_age_17_'])[base]
+    result['total_enrolments'] = enrol_sums[:, 0]
+    result['total_demo_updates'] = groups.sum(1, ['total_demo_updates'])[base, 0]
+    result['total_bio_updates'] = bio_sums[:, 0]
+    result['age_5_17'] = enrol_sums[:, 1]
+    result['age_18_greater'] = enrol_sums[:, 2]
+    result['bio_age_5_17'] = bio_sums[:, 1]
+    result['bio_age_17_'] = bio_sums[:, 2]
+
+    result['ifi'] = (result['total_demo_updates'] + result['total_bio_updates']) / result['total_enrolments']
+    result['clcr'] = result['bio_age_5_17'] / (result['age_5_17'] * 0.20)
+    result['lifecycle_gap'] = (
+        result['age_5_17'] / (result['age_5_17'] + result['age_18_greater']) -
+        result['bio_age_5_17'] / (result['bio_age_5_17'] + result['bio_age_17_'])
+    )
+    return result
+
+
+def best_of(func, *args) -> float:
+    """Best wall time of REPEATS runs."""
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+
+    enrol = make_frame(n_rows, ['total_enrolments', 'age_5_17', 'age_18_greater'], seed=0)
+    demo = make_frame(n_rows, ['total_demo_updates'], seed=1)
+    bio = make_frame(n_rows, ['total_bio_updates', 'bio_age_5_17', 'bio_age_17_'], seed=2)
+
+    print("=" * 60)
+    print(f"⏱️  GROUP AGGREGATION BENCHMARK ({n_rows:,} rows per dataset)")
+    print("=" * 60)
+
+    for label, keys in [('state', ['state']), ('district', ['state', 'district'])]:
+        expected = pandas_chain(enrol, demo, bio, keys)
+        actual = bincount_engine(enrol, demo, bio, keys)
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_categorical=False)
+
+        t_pandas = best_of(pandas_chain, enrol, demo, bio, keys)
+        t_engine = best_of(bincount_engine, enrol, demo, bio, keys)
+        print(f"  {label:<9} groupby+merge: {t_pandas * 1000:8.1f} ms   "
+              f"bincount: {t_engine * 1000:8.1f} ms   speedup: {t_pandas / t_engine:4.1f}x")
+
+    print("\n✅ Results identical")
@@ -0,0 +1,76 @@
+"""
+Weight Sensitivity Benchmark
+============================
+Checks the vectorized sweep in src/sensitivity.py against the scalar path
+(calculate_rps_dataframe + calculate_intervention_priority, one weighting
+at a time) on synthetic district metrics, then times a large sweep.
+
+Usage:
+    python scripts/benchmark_sensitivity.py [n_weightings]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import numpy as np
+
+from src.metrics import calculate_rps_dataframe, calculate_intervention_priority
+from src.sensitivity import TIER_LABELS, dirichlet_weights, weight_sensitivity
+
+
+N_DISTRICTS = 700
+N_CHECKED = 50
+
+
+def make_metrics(n: int, seed: int) -> pd.DataFrame:
+    """District metrics rounded to 2 decimals, so ties and rounding boundaries occur."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'state': [f'State {i // 20:02d}' for i in range(n)],
+        'district': [f'District {i:04d}' for i in range(n)],
+        'ifi': rng.uniform(0, 1.5, n).round(2),
+        'clcr': rng.uniform(0, 1.2, n).round(2),
+        'taes': rng.uniform(0.3, 1.2, n).round(2),
+        'population': rng.integers(10_000, 5_000_000, n),
+    })
+
+
+def scalar_tier_shares(metrics_df: pd.DataFrame, weights: np.ndarray, population_col) -> np.ndarray:
+    """Tier shares per district from the production pipeline, one weighting at a time."""
+    shares = np.zeros((len(metrics_df), len(TIER_LABELS)))
+    for w in weights:
+        scored = calculate_rps_dataframe(metrics_df, weights=w)
+        tiers = calculate_intervention_priority(scored, population_col).sort_index()['intervention_tier']
+        shares[np.arange(len(metrics_df)), tiers.cat.codes.to_numpy()] += 1
+    return shares / len(weights)
+
+
+if __name__ == '__main__':
+    n_weightings = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    metrics_df = make_metrics(N_DISTRICTS, seed=0)
+    keys = ['state', 'district']
+    shares = [f'p_tier_{i + 1}' for i in range(len(TIER_LABELS))]
+
+    print("=" * 60)
+    print(f"⏱️  WEIGHT SENSITIVITY BENCHMARK ({N_DISTRICTS} districts)")
+    print("=" * 60)
+
+    weights = dirichlet_weights(N_CHECKED, random_seed=1)
+    for population_col in [None, 'population']:
+        expected = scalar_tier_shares(metrics_df, weights, population_col)
+        actual = weight_sensitivity(
+            metrics_df, weights=weights, key_cols=keys, population_col=population_col
+        ).set_index(keys).loc[pd.MultiIndex.from_frame(metrics_df[keys]), shares].to_numpy()
+        np.testing.assert_array_equal(expected, actual)
+    print(f"  {N_CHECKED} weightings match the scalar pipeline (with and without population)")
+
+    start = time.perf_counter()
+    weight_sensitivity(metrics_df, n_samples=n_weightings, key_cols=keys, population_col='population')
+    print(f"  {n_weightings:,} weightings: {time.perf_counter() - start:.2f} s")
+
+    print("\n✅ Tier frequencies identical")
@@ -295,7 +295,7 @@ ENHANCEMENT_CELLS = [
             "    Calculate equity gap - disparity within groups.\n",
             "    EGS = (Max - Min) / Mean\n",
             "    \"\"\"\n",
-            "    result = df.groupby(group_col).agg({\n",
+            "    result = df.groupby(group_col, observed=True).agg({\n",
             "        metric_col: ['min', 'max', 'mean', 'std', 'count']\n",
             "    }).reset_index()\n",
             "    \n",
@@ -12,12 +12,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import yaml
-from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
-# Import state mapping
+# Import state mapping and loaders
 from src.state_mapping import standardize_dataframe_states
+from src.data_loader import load_all_datasets, LoadTelemetry
 
 # Set style
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -37,19 +37,23 @@ print("="*70)
 # ============================================
 print("\n[1/6] Loading datasets...")
 
-enrol_path = Path(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw\Enrolment')
-enrol_dfs = [pd.read_csv(f, on_bad_lines='skip') for f in enrol_path.glob('*.csv')]
-enrolment_df = pd.concat(enrol_dfs, ignore_index=True)
-
-demo_path = Path(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw\Demographic')
-demo_dfs = [pd.read_csv(f, on_bad_lines='skip') for f in demo_path.glob('*.csv')]
-demographic_df = pd.concat(demo_dfs, ignore_index=True)
-
-bio_path = Path(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw\Biometric')
-bio_dfs = [pd.read_csv(f, on_bad_lines='skip') for f in bio_path.glob('*.csv')]
-biometric_df = pd.concat(bio_dfs, ignore_index=True)
-
-population_df = pd.read_csv(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\external\state_population.csv')
+# Raw chunks are parsed once and served from the columnar cache afterwards
+raw_dir = r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw'
+cache_dir = r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\processed\cache'
+read_kwargs = {'on_bad_lines': 'skip'}
+
+# All three datasets and the population file load concurrently
+telemetry = LoadTelemetry(verbose=False)
+datasets = load_all_datasets(
+    raw_dir, cache_dir=cache_dir, read_kwargs=read_kwargs,
+    population_path=r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\external\state_population.csv',
+    telemetry=telemetry
+)
+enrolment_df = datasets['enrolment']
+demographic_df = datasets['demographic']
+biometric_df = datasets['biometric']
+population_df = datasets['population']
+telemetry.print_summary()
 
 print(f"   Enrolment: {len(enrolment_df):,} rows")
 print(f"   Demographic: {len(demographic_df):,} rows")
@@ -90,9 +94,9 @@ print(f"   Date range: {enrolment_df['date'].min().date()} to {enrolment_df['dat
 print("\n[4/6] Calculating metrics...")
 
 # IFI
-enrol_state = enrolment_df.groupby('state')['total_enrolments'].sum().reset_index()
-demo_state = demographic_df.groupby('state')['total_demo_updates'].sum().reset_index()
-bio_state = biometric_df.groupby('state')['total_bio_updates'].sum().reset_index()
+enrol_state = enrolment_df.groupby('state', observed=True)['total_enrolments'].sum().reset_index()
+demo_state = demographic_df.groupby('state', observed=True)['total_demo_updates'].sum().reset_index()
+bio_state = biometric_df.groupby('state', observed=True)['total_bio_updates'].sum().reset_index()
 
 ifi_df = enrol_state.merge(demo_state, on='state', how='left')
 ifi_df = ifi_df.merge(bio_state, on='state', how='left').fillna(0)
@@ -101,17 +105,17 @@ ifi_df['ifi'] = ifi_df['total_updates'] / ifi_df['total_enrolments'].replace(0,
 ifi_df['ifi'] = ifi_df['ifi'].fillna(0)
 
 # CLCR
-enrol_child = enrolment_df.groupby('state')['age_5_17'].sum().reset_index()
-bio_child = biometric_df.groupby('state')['bio_age_5_17'].sum().reset_index()
+enrol_child = enrolment_df.groupby('state', observed=True)['age_5_17'].sum().reset_index()
+bio_child = biometric_df.groupby('state', observed=True)['bio_age_5_17'].sum().reset_index()
 clcr_df = enrol_child.merge(bio_child, on='state', how='left').fillna(0)
 clcr_df['clcr'] = clcr_df['bio_age_5_17'] / (clcr_df['age_5_17'] * 0.20).replace(0, np.nan)
 clcr_df['clcr'] = clcr_df['clcr'].fillna(0)
 
 # TAES
-daily_enrol = enrolment_df.groupby(['state', 'date', 'is_weekend'])['total_enrolments'].sum().reset_index()
-weekend_avg = daily_enrol[daily_enrol['is_weekend']].groupby('state')['total_enrolments'].mean().reset_index()
+daily_enrol = enrolment_df.groupby(['state', 'date', 'is_weekend'], observed=True)['total_enrolments'].sum().reset_index()
+weekend_avg = daily_enrol[daily_enrol['is_weekend']].groupby('state', observed=True)['total_enrolments'].mean().reset_index()
 weekend_avg.columns = ['state', 'weekend_avg']
-weekday_avg = daily_enrol[~daily_enrol['is_weekend']].groupby('state')['total_enrolments'].mean().reset_index()
+weekday_avg = daily_enrol[~daily_enrol['is_weekend']].groupby('state', observed=True)['total_enrolments'].mean().reset_index()
 weekday_avg.columns = ['state', 'weekday_avg']
 taes_df = weekend_avg.merge(weekday_avg, on='state', how='outer').fillna(0)
 taes_df['taes'] = taes_df['weekend_avg'] / taes_df['weekday_avg'].replace(0, np.nan)
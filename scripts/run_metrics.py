@@ -11,7 +11,9 @@ sys.path.insert(0, r'c:\Users\anish\Desktop\UIDAI_HACKATHON')
 import pandas as pd
 import numpy as np
 import yaml
-from pathlib import Path
+
+from src.data_loader import load_all_datasets, LoadTelemetry
+from src.groupsum import GroupCodes
 
 # Load configuration from config.yaml
 # This is how you use config.yaml - load once, use everywhere
@@ -30,30 +32,23 @@ print()
 # Load all datasets
 print("📁 Loading datasets...")
 
-# Enrolment
-enrol_path = Path(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw\Enrolment')
-enrol_files = list(enrol_path.glob('*.csv'))
-enrol_dfs = [pd.read_csv(f, on_bad_lines='skip') for f in enrol_files]
-enrolment_df = pd.concat(enrol_dfs, ignore_index=True)
-print(f"  ✓ Enrolment: {len(enrolment_df):,} rows")
-
-# Demographic
-demo_path = Path(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw\Demographic')
-demo_files = list(demo_path.glob('*.csv'))
-demo_dfs = [pd.read_csv(f, on_bad_lines='skip') for f in demo_files]
-demographic_df = pd.concat(demo_dfs, ignore_index=True)
-print(f"  ✓ Demographic: {len(demographic_df):,} rows")
-
-# Biometric
-bio_path = Path(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw\Biometric')
-bio_files = list(bio_path.glob('*.csv'))
-bio_dfs = [pd.read_csv(f, on_bad_lines='skip') for f in bio_files]
-biometric_df = pd.concat(bio_dfs, ignore_index=True)
-print(f"  ✓ Biometric: {len(biometric_df):,} rows")
-
-# Population
-population_df = pd.read_csv(r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\external\state_population.csv')
-print(f"  ✓ Population: {len(population_df)} states")
+# Raw chunks are parsed once and served from the columnar cache afterwards
+raw_dir = r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\raw'
+cache_dir = r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\processed\cache'
+read_kwargs = {'on_bad_lines': 'skip'}
+
+# All three datasets and the population file load concurrently
+telemetry = LoadTelemetry()
+datasets = load_all_datasets(
+    raw_dir, cache_dir=cache_dir, read_kwargs=read_kwargs,
+    population_path=r'c:\Users\anish\Desktop\UIDAI_HACKATHON\data\external\state_population.csv',
+    telemetry=telemetry
+)
+enrolment_df = datasets['enrolment']
+demographic_df = datasets['demographic']
+biometric_df = datasets['biometric']
+population_df = datasets['population']
+telemetry.print_summary()
 
 # Preprocess
 enrolment_df['date'] = pd.to_datetime(enrolment_df['date'], format='%d-%m-%Y', errors='coerce')
@@ -73,14 +68,16 @@ print("\n" + "=" * 60)
 print("📈 METRIC 1: IDENTITY FRESHNESS INDEX (IFI)")
 print("=" * 60)
 
-# Calculate IFI by state
-enrol_state = enrolment_df.groupby('state')['total_enrolments'].sum().reset_index()
-demo_state = demographic_df.groupby('state')['total_demo_updates'].sum().reset_index()
-bio_state = biometric_df.groupby('state')['total_bio_updates'].sum().reset_index()
+# Factorize the state column of all three datasets once; every per-state
+# sum below is a bincount aligned to the same state positions
+groups = GroupCodes([enrolment_df, demographic_df, biometric_df], 'state')
+has_enrol = groups.present(0)
 
-ifi_df = enrol_state.merge(demo_state, on='state', how='left')
-ifi_df = ifi_df.merge(bio_state, on='state', how='left')
-ifi_df = ifi_df.fillna(0)
+# Calculate IFI by state
+ifi_df = groups.keys()[has_enrol].reset_index(drop=True)
+ifi_df['total_enrolments'] = groups.sum(0, ['total_enrolments'])[has_enrol, 0]
+ifi_df['total_demo_updates'] = groups.sum(1, ['total_demo_updates'])[has_enrol, 0]
+ifi_df['total_bio_updates'] = groups.sum(2, ['total_bio_updates'])[has_enrol, 0]
 
 ifi_df['total_updates'] = ifi_df['total_demo_updates'] + ifi_df['total_bio_updates']
 ifi_df['ifi'] = ifi_df['total_updates'] / ifi_df['total_enrolments'].replace(0, np.nan)
@@ -117,11 +114,9 @@ print("\n" + "=" * 60)
 print("👶 METRIC 2: CHILD LIFECYCLE CAPTURE RATE (CLCR)")
 print("=" * 60)
 
-enrol_child = enrolment_df.groupby('state')['age_5_17'].sum().reset_index()
-bio_child = biometric_df.groupby('state')['bio_age_5_17'].sum().reset_index()
-
-clcr_df = enrol_child.merge(bio_child, on='state', how='left')
-clcr_df = clcr_df.fillna(0)
+clcr_df = groups.keys()[has_enrol].reset_index(drop=True)
+clcr_df['age_5_17'] = groups.sum(0, ['age_5_17'])[has_enrol, 0]
+clcr_df['bio_age_5_17'] = groups.sum(2, ['bio_age_5_17'])[has_enrol, 0]
 
 expected_rate = config['analysis']['expected_child_update_rate']
 clcr_df['expected_updates'] = clcr_df['age_5_17'] * expected_rate
@@ -146,12 +141,12 @@ print("\n" + "=" * 60)
 print("📅 METRIC 3: TEMPORAL ACCESS EQUITY SCORE (TAES)")
 print("=" * 60)
 
-daily_enrol = enrolment_df.groupby(['state', 'date', 'is_weekend'])['total_enrolments'].sum().reset_index()
+daily_enrol = enrolment_df.groupby(['state', 'date', 'is_weekend'], observed=True)['total_enrolments'].sum().reset_index()
 
-weekend_avg = daily_enrol[daily_enrol['is_weekend']].groupby('state')['total_enrolments'].mean().reset_index()
+weekend_avg = daily_enrol[daily_enrol['is_weekend']].groupby('state', observed=True)['total_enrolments'].mean().reset_index()
 weekend_avg.columns = ['state', 'weekend_avg']
 
-weekday_avg = daily_enrol[~daily_enrol['is_weekend']].groupby('state')['total_enrolments'].mean().reset_index()
+weekday_avg = daily_enrol[~daily_enrol['is_weekend']].groupby('state', observed=True)['total_enrolments'].mean().reset_index()
 weekday_avg.columns = ['state', 'weekday_avg']
 
 taes_df = weekend_avg.merge(weekday_avg, on='state', how='outer').fillna(0)
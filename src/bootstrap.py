@@ -0,0 +1,308 @@
+"""
+Bootstrap Uncertainty for Dashboard Metrics
+===========================================
+Nonparametric intervals for IFI, CLCR, TAES, UCR and the composite score,
+and how stable each state's composite rank is.
+
+Resampling is clustered within state: each resample redraws the state's
+districts (or days) with replacement. Every resample is a row of
+multinomial weights over the resampling units, so a batch of B resamples
+reduces to one matrix product per state over per-unit sums. No frame is
+rebuilt per resample.
+"""
+
+import os
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, Dict
+import warnings
+warnings.filterwarnings('ignore')
+
+from .metrics import build_metric_cubes
+from .utils import load_config
+
+
+# =============================================================================
+# UNIT TABLES
+# =============================================================================
+
+BOOTSTRAP_METRICS = ['ifi', 'clcr', 'taes', 'ucr', 'composite_score']
+
+# Per-unit additive sums; the day columns are only used when resampling days
+UNIT_COLUMNS = [
+    'total_enrolments', 'age_5_17', 'total_demo_updates', 'total_bio_updates',
+    'bio_age_5_17', 'weekend_total', 'weekday_total', 'weekend_days', 'weekday_days',
+    'is_active', 'has_updates',
+]
+
+RESAMPLING_UNITS = ('district', 'day')
+
+
+def _unit_table(
+    cubes: Dict[str, pd.DataFrame],
+    unit: str,
+    min_activity_threshold: int
+) -> pd.DataFrame:
+    """
+    Per-unit sums of every metric component, sorted by state.
+
+    Units are (state, district) or (state, date) pairs. The day columns of
+    district units hold nothing; day counts then stay fixed per state.
+    """
+    unit_key = 'district' if unit == 'district' else 'date'
+    keys = ['state', unit_key]
+
+    enrol = cubes['enrolment'].copy()
+    weekend = enrol['is_weekend'].to_numpy(dtype=bool)
+    enrol['weekend_total'] = np.where(weekend, enrol['total_enrolments'], 0)
+    enrol['weekday_total'] = np.where(weekend, 0, enrol['total_enrolments'])
+
+    parts = [
+        enrol.groupby(keys, observed=True)[
+            ['total_enrolments', 'age_5_17', 'weekend_total', 'weekday_total']
+        ].sum(),
+        cubes['demographic'].groupby(keys, observed=True)[['total_demo_updates']].sum(),
+        cubes['biometric'].groupby(keys, observed=True)[['total_bio_updates', 'bio_age_5_17']].sum(),
+    ]
+    units = pd.concat(parts, axis=1).fillna(0).astype(np.float64)
+
+    updates = units['total_demo_updates'] + units['total_bio_updates']
+    has_updates = units.index.isin(parts[1].index.union(parts[2].index))
+    units['has_updates'] = has_updates.astype(np.float64)
+    units['is_active'] = ((updates >= min_activity_threshold) & has_updates).astype(np.float64)
+
+    if unit == 'day':
+        day_flags = enrol.groupby(keys, observed=True)['is_weekend'].first()
+        day_flags = day_flags.reindex(units.index)
+        units['weekend_days'] = (day_flags == True).astype(np.float64)
+        units['weekday_days'] = (day_flags == False).astype(np.float64)
+    else:
+        units['weekend_days'] = 0.0
+        units['weekday_days'] = 0.0
+
+    units = units.reset_index()
+    units['state'] = units['state'].astype(object)
+    return units.sort_values(['state', unit_key], kind='stable').reset_index(drop=True)
+
+
+def _fixed_day_counts(enrolment_cube: pd.DataFrame, states: np.ndarray) -> np.ndarray:
+    """Weekend and weekday day counts per state, shape (n_states, 2)."""
+    days = enrolment_cube.dropna(subset=['date']).drop_duplicates(['state', 'date'])
+    counts = days.groupby([days['state'].astype(object), 'is_weekend']).size().unstack(fill_value=0)
+    counts = counts.reindex(index=states, columns=[True, False], fill_value=0)
+    return counts.to_numpy(dtype=np.float64)
+
+
+# =============================================================================
+# METRICS FROM SUMS
+# =============================================================================
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den with 0 where den is 0, as the metric functions fill it."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den != 0, num / np.where(den != 0, den, 1), 0.0)
+
+
+def _metrics_from_sums(
+    sums: np.ndarray,
+    day_counts: Optional[np.ndarray],
+    expected_annual_update_rate: float
+) -> np.ndarray:
+    """
+    Metric values from component sums.
+
+    sums has UNIT_COLUMNS on its last axis; the result has BOOTSTRAP_METRICS.
+    day_counts (n_states, 2) replaces the day columns for district units.
+    """
+    col = {name: sums[..., i] for i, name in enumerate(UNIT_COLUMNS)}
+    if day_counts is not None:
+        col['weekend_days'] = np.broadcast_to(day_counts[:, 0], col['weekend_days'].shape)
+        col['weekday_days'] = np.broadcast_to(day_counts[:, 1], col['weekday_days'].shape)
+
+    ifi = _ratio(col['total_demo_updates'] + col['total_bio_updates'], col['total_enrolments'])
+    clcr = _ratio(col['bio_age_5_17'], col['age_5_17'] * expected_annual_update_rate)
+    taes = np.minimum(_ratio(
+        _ratio(col['weekend_total'], col['weekend_days']),
+        _ratio(col['weekday_total'], col['weekday_days'])
+    ), 1.5)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ucr = col['is_active'] / col['has_updates']
+
+    composite = (
+        np.minimum(ifi, 1) * 0.30 +
+        np.minimum(clcr, 1) * 0.25 +
+        np.minimum(taes, 1) * 0.20 +
+        ucr * 0.25
+    )
+    return np.stack([ifi, clcr, taes, ucr, composite], axis=-1)
+
+
+def _min_rank(scores: np.ndarray) -> np.ndarray:
+    """Rank 1 = lowest score along the last axis; ties share the best rank."""
+    return 1 + (scores[..., None, :] < scores[..., :, None]).sum(axis=-1)
+
+
+# =============================================================================
+# RESAMPLING
+# =============================================================================
+
+def _bootstrap_batch(
+    seed: np.random.SeedSequence,
+    n_resamples: int,
+    values: np.ndarray,
+    bounds: np.ndarray,
+    day_counts: Optional[np.ndarray],
+    expected_annual_update_rate: float
+) -> np.ndarray:
+    """
+    Metrics for one batch of resamples, shape (n_resamples, n_states, n_metrics).
+
+    Units of state s are the rows bounds[s]:bounds[s+1] of values. Each is
+    redrawn with replacement via multinomial weights, and the weighted sums
+    are a single matrix product per state.
+    """
+    rng = np.random.default_rng(seed)
+    n_states = len(bounds) - 1
+    sums = np.empty((n_resamples, n_states, values.shape[1]))
+
+    for s in range(n_states):
+        block = values[bounds[s]:bounds[s + 1]]
+        n = len(block)
+        weights = rng.multinomial(n, np.full(n, 1.0 / n), size=n_resamples)
+        sums[:, s, :] = weights @ block
+
+    return _metrics_from_sums(sums, day_counts, expected_annual_update_rate)
+
+
+def bootstrap_metrics(
+    enrolment_df: Optional[pd.DataFrame] = None,
+    demographic_df: Optional[pd.DataFrame] = None,
+    biometric_df: Optional[pd.DataFrame] = None,
+    n_resamples: int = 1000,
+    unit: str = 'district',
+    confidence: float = 0.95,
+    random_seed: Optional[int] = None,
+    bottom_k: int = 5,
+    n_workers: int = 1,
+    batch_size: int = 1000,
+    min_activity_threshold: int = 100,
+    expected_annual_update_rate: float = 0.20,
+    cubes: Optional[dict] = None
+) -> pd.DataFrame:
+    """
+    Bootstrap percentile intervals and rank stability per state.
+
+    Resamples districts (or days) with replacement within each state and
+    recomputes IFI, CLCR, TAES, UCR and the composite score of
+    calculate_all_metrics for every resample. When resampling days, UCR is
+    a district-coverage measure and so stays at its point estimate. When
+    resampling districts, the day counts behind TAES stay fixed.
+
+    Resamples are drawn in batches of batch_size from independent seeds,
+    so results are reproducible and the same with or without a pool.
+
+    Parameters
+    ----------
+    enrolment_df, demographic_df, biometric_df : Raw or preprocessed frames
+    n_resamples : Number of bootstrap resamples B
+    unit : 'district' or 'day' - the resampling unit
+    confidence : Width of the percentile intervals
+    random_seed : Defaults to random_seed from config.yaml
+    bottom_k : Report the probability of ranking among the k lowest
+        composite scores (the intervention shortlist)
+    n_workers : Worker processes for the batches (1 = in-process)
+    batch_size : Resamples per batch
+    cubes : Prebuilt cubes from build_metric_cubes (frames ignored)
+
+    Returns
+    -------
+    DataFrame per state with each metric's point estimate, _ci_lower and
+    _ci_upper, and composite rank statistics: rank (1 = lowest composite),
+    rank_ci_lower / rank_ci_upper, p_same_rank and p_bottom_<k>
+    """
+    if unit not in RESAMPLING_UNITS:
+        raise ValueError(f"Unknown resampling unit: {unit}. Choose from {RESAMPLING_UNITS}")
+
+    if random_seed is None:
+        random_seed = load_config().get('random_seed', 42)
+
+    if cubes is None:
+        cubes = build_metric_cubes(enrolment_df, demographic_df, biometric_df)
+
+    units = _unit_table(cubes, unit, min_activity_threshold)
+
+    # IFI (the dashboard's base table) is defined for states with enrolments
+    enrolled = pd.unique(cubes['enrolment']['state'].dropna().astype(object))
+    units = units[units['state'].isin(enrolled)].reset_index(drop=True)
+
+    states, starts = np.unique(units['state'].to_numpy(), return_index=True)
+    bounds = np.append(starts, len(units))
+    values = units[UNIT_COLUMNS].to_numpy(dtype=np.float64)
+    day_counts = _fixed_day_counts(cubes['enrolment'], states) if unit == 'district' else None
+
+    point_sums = np.add.reduceat(values, starts, axis=0)
+    point = _metrics_from_sums(point_sums, day_counts, expected_annual_update_rate)
+
+    # Fixed batch layout, so the draws do not depend on n_workers
+    sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        sizes.append(n_resamples % batch_size)
+    seeds = np.random.SeedSequence(random_seed).spawn(len(sizes))
+
+    run = partial(_bootstrap_batch, values=values, bounds=bounds, day_counts=day_counts,
+                  expected_annual_update_rate=expected_annual_update_rate)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(sizes)))
+
+    if n_workers == 1:
+        batches = [run(seed, size) for seed, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            batches = list(pool.map(run, seeds, sizes))
+
+    boot = np.concatenate(batches, axis=0)
+
+    if unit == 'day':
+        # UCR counts districts, so it cannot be resampled over days: hold it
+        # (and its share of the composite) at the district-level estimate
+        districts = _unit_table(cubes, 'district', min_activity_threshold)
+        districts = districts[districts['state'].isin(enrolled)]
+        coverage = districts.groupby('state')[['is_active', 'has_updates']].sum().reindex(states)
+        ucr = (coverage['is_active'] / coverage['has_updates']).to_numpy()
+
+        ucr_idx = BOOTSTRAP_METRICS.index('ucr')
+        composite_idx = BOOTSTRAP_METRICS.index('composite_score')
+        for metrics in (point, boot):
+            metrics[..., composite_idx] += (ucr - metrics[..., ucr_idx]) * 0.25
+            metrics[..., ucr_idx] = ucr
+
+    alpha = (1 - confidence) / 2
+    lower = np.nanquantile(boot, alpha, axis=0)
+    upper = np.nanquantile(boot, 1 - alpha, axis=0)
+
+    result = pd.DataFrame({'state': states})
+    for i, metric in enumerate(BOOTSTRAP_METRICS):
+        result[metric] = point[:, i]
+        result[f'{metric}_ci_lower'] = lower[:, i]
+        result[f'{metric}_ci_upper'] = upper[:, i]
+
+    # Rank stability of the composite score
+    composite_idx = BOOTSTRAP_METRICS.index('composite_score')
+    point_rank = _min_rank(point[:, composite_idx])
+    ranks = np.concatenate([
+        _min_rank(boot[start:start + batch_size, :, composite_idx])
+        for start in range(0, len(boot), batch_size)
+    ])
+
+    result['rank'] = point_rank
+    result['rank_ci_lower'] = np.quantile(ranks, alpha, axis=0, method='lower')
+    result['rank_ci_upper'] = np.quantile(ranks, 1 - alpha, axis=0, method='higher')
+    result['p_same_rank'] = (ranks == point_rank).mean(axis=0)
+    result[f'p_bottom_{bottom_k}'] = (ranks <= bottom_k).mean(axis=0)
+    result['n_units'] = np.diff(bounds)
+
+    return result.sort_values('composite_score', ascending=True).reset_index(drop=True)
@@ -7,88 +7,1212 @@ Functions to load, merge, and preprocess Aadhaar datasets.
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+import hashlib
+import json
+import os
+import threading
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from .utils import load_config, profiled
 
-def load_dataset_chunks(folder_path: str, dataset_type: str) -> pd.DataFrame:
+
+# Default location for the per-chunk columnar cache
+DEFAULT_CACHE_DIR = 'data/processed/cache'
+
+# Default location for the incremental, date-partitioned store
+DEFAULT_STORE_DIR = 'data/processed/store'
+
+# Declared read-time schema per dataset type. Count columns are downcast to
+# the smallest unsigned type that still holds their row total, so derived
+# totals (e.g. total_enrolments) never overflow.
+DATASET_SCHEMAS = {
+    'enrolment': {
+        'categories': ['state', 'district'],
+        'counts': ['age_0_5', 'age_5_17', 'age_18_greater'],
+        'total': 'total_enrolments',
+    },
+    'demographic': {
+        'categories': ['state', 'district'],
+        'counts': ['demo_age_5_17', 'demo_age_17_'],
+        'total': 'total_demo_updates',
+    },
+    'biometric': {
+        'categories': ['state', 'district'],
+        'counts': ['bio_age_5_17', 'bio_age_17_'],
+        'total': 'total_bio_updates',
+    },
+}
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Calendar features derivable from the date column. Each is evaluated on
+# the distinct dates only and broadcast back to rows through their codes.
+CALENDAR_FEATURES = {
+    'year': lambda dates: dates.year,
+    'month': lambda dates: dates.month,
+    'month_name': lambda dates: dates.month_name(),
+    'day': lambda dates: dates.day,
+    'weekday': lambda dates: dates.day_name(),
+    'week_of_year': lambda dates: dates.isocalendar().week.to_numpy(),
+    'is_weekend': lambda dates: dates.dayofweek >= 5,
+}
+
+
+def parse_dates(values: pd.Series, date_format: str = DATE_FORMAT) -> pd.Series:
+    """
+    Parse a date column by parsing each distinct string only once.
+    
+    The raw data has a few dozen distinct dates spread over millions of
+    rows, so the column is factorized, the uniques are parsed, and the
+    result is broadcast back through the codes. Unparseable values become
+    NaT, as with pd.to_datetime(errors='coerce').
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques), format=date_format, errors='coerce')
+    return pd.Series(
+        parsed.take(codes, allow_fill=True, fill_value=pd.NaT),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def calendar_feature(dates: pd.Series, feature: str) -> pd.Series:
+    """
+    Derive one calendar feature (see CALENDAR_FEATURES) from a date column.
+    
+    Computed on the distinct dates and broadcast through their codes.
+    Missing dates give NaN, except is_weekend which is False.
+    """
+    if feature not in CALENDAR_FEATURES:
+        raise ValueError(f"Unknown calendar feature: {feature}")
+    
+    codes, uniques = pd.factorize(dates)
+    values = pd.Series(np.asarray(CALENDAR_FEATURES[feature](pd.DatetimeIndex(uniques))))
+    if (codes < 0).any():
+        # code -1 indexes this trailing fill value
+        fill = False if feature == 'is_weekend' else np.nan
+        values = pd.concat([values, pd.Series([fill])], ignore_index=True)
+    
+    return pd.Series(values.to_numpy()[codes], index=dates.index, name=feature)
+
+
+def temporal_feature(df: pd.DataFrame, feature: str) -> pd.Series:
+    """
+    Return a calendar feature column, computing it on first access.
+    
+    preprocess_dataframe no longer materializes every calendar column up
+    front; callers ask for the one they need and it is added to ``df`` so
+    later accesses reuse it.
+    """
+    if feature not in df.columns:
+        df[feature] = calendar_feature(parse_dates(df['date']), feature)
+    return df[feature]
+
+
+class LoadTelemetry:
+    """
+    Progress and throughput recorder shared by all loaders.
+    
+    Loaders report every file they read and the start/end of every dataset
+    here instead of printing directly. The object is thread-safe, so
+    datasets loaded concurrently can share one instance; summary() then
+    gives rows/s, MB/s and wall time per dataset.
+    
+    Parameters
+    ----------
+    verbose : bool
+        Print progress lines as events arrive (default True)
+    """
+    
+    def __init__(self, verbose: bool = True):
+        self.verbose = verbose
+        self.files = []
+        self.datasets = {}
+        self._lock = threading.Lock()
+        self._print_lock = threading.Lock()
+    
+    def _emit(self, message: str):
+        if self.verbose:
+            # print() writes the text and newline separately; keep lines whole
+            with self._print_lock:
+                print(message, flush=True)
+    
+    def start_dataset(self, dataset: str, n_files: int, detail: str = ''):
+        """Mark the start of a dataset load."""
+        with self._lock:
+            self.datasets[dataset] = {
+                'files': n_files, 'rows': 0, 'bytes': 0,
+                'start': time.perf_counter(), 'end': None,
+            }
+        suffix = f" ({detail})" if detail else ""
+        self._emit(f"📂 Loading {dataset}: {n_files} files{suffix}")
+    
+    def file_loaded(self, dataset: str, file: Path, rows: int,
+                    seconds: float, source: str = 'csv'):
+        """Record one file read (or folded) for a dataset."""
+        size = Path(file).stat().st_size if Path(file).exists() else 0
+        with self._lock:
+            self.files.append({
+                'dataset': dataset, 'file': Path(file).name, 'source': source,
+                'rows': rows, 'bytes': size, 'seconds': seconds,
+            })
+            if dataset in self.datasets:
+                self.datasets[dataset]['bytes'] += size
+        rate = seconds if seconds > 0 else float('nan')
+        self._emit(f"   ✓ [{dataset}] {Path(file).name} [{source}]: {rows:,} rows in "
+                   f"{seconds:.2f}s ({rows / rate:,.0f} rows/s, "
+                   f"{size / 1024 / 1024 / rate:.1f} MB/s)")
+    
+    def finish_dataset(self, dataset: str, rows: int, detail: str = ''):
+        """Mark the end of a dataset load with its final row count."""
+        with self._lock:
+            record = self.datasets.setdefault(dataset, {
+                'files': 0, 'rows': 0, 'bytes': 0,
+                'start': time.perf_counter(), 'end': None,
+            })
+            record['rows'] = rows
+            record['end'] = time.perf_counter()
+            wall = record['end'] - record['start']
+        suffix = f", {detail}" if detail else ""
+        self._emit(f"   📊 [{dataset}] {rows:,} rows in {wall:.2f}s "
+                   f"({rows / max(wall, 1e-9):,.0f} rows/s{suffix})")
+    
+    def warn(self, message: str):
+        """Report a non-fatal loader problem."""
+        self._emit(f"⚠️ Warning: {message}")
+    
+    def file_table(self) -> pd.DataFrame:
+        """Per-file timings as a DataFrame."""
+        with self._lock:
+            return pd.DataFrame(self.files)
+    
+    def summary(self) -> pd.DataFrame:
+        """Per-dataset rows, bytes, wall time and throughput."""
+        rows = []
+        with self._lock:
+            for dataset, record in self.datasets.items():
+                end = record['end'] if record['end'] is not None else time.perf_counter()
+                wall = end - record['start']
+                rows.append({
+                    'dataset': dataset,
+                    'files': record['files'],
+                    'rows': record['rows'],
+                    'mb': record['bytes'] / 1024 / 1024,
+                    'wall_s': wall,
+                    'rows_per_s': record['rows'] / max(wall, 1e-9),
+                    'mb_per_s': record['bytes'] / 1024 / 1024 / max(wall, 1e-9),
+                })
+        return pd.DataFrame(rows)
+    
+    def print_summary(self):
+        """Print the per-dataset summary table."""
+        print(f"\n{'='*50}")
+        print("⏱️ LOAD TELEMETRY")
+        print(f"{'='*50}")
+        for _, row in self.summary().iterrows():
+            print(f"  {row['dataset']:<12} {row['rows']:>12,} rows  {row['wall_s']:6.2f}s  "
+                  f"{row['rows_per_s']:>12,.0f} rows/s  {row['mb_per_s']:7.1f} MB/s")
+        print(f"{'='*50}\n")
+
+
+def _smallest_uint(max_value: int) -> np.dtype:
+    """Smallest unsigned integer dtype able to hold max_value."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def apply_schema(df: pd.DataFrame, dataset_type: str) -> pd.DataFrame:
+    """
+    Convert a raw chunk to the declared compact schema (in place).
+    
+    state/district become categoricals, counts the smallest safe unsigned
+    integer, pincode uint32 and date a parsed datetime. Columns that cannot
+    be converted safely (nulls, negatives) keep their inferred dtype.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Raw chunk as returned by pd.read_csv
+    dataset_type : str
+        One of 'enrolment', 'demographic', 'biometric' (case-insensitive)
+    
+    Returns:
+    --------
+    pd.DataFrame
+        The same dataframe with typed columns
+    """
+    schema = DATASET_SCHEMAS.get(dataset_type.lower())
+    if schema is None:
+        return df
+    
+    if 'date' in df.columns:
+        df['date'] = parse_dates(df['date'])
+    
+    for col in schema['categories']:
+        if col in df.columns:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+            elif not df[col].cat.categories.is_monotonic_increasing:
+                # Dictionary-encoded input keeps first-seen order; sort it so
+                # groupby output is ordered the same way for every loader
+                df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    
+    counts = [col for col in schema['counts'] if col in df.columns]
+    if counts and all(pd.api.types.is_integer_dtype(df[col]) for col in counts):
+        values = df[counts]
+        if len(values) and values.min().min() >= 0:
+            dtype = _smallest_uint(int(values.sum(axis=1).max()))
+            df[counts] = values.astype(dtype)
+    
+    if 'pincode' in df.columns and pd.api.types.is_integer_dtype(df['pincode']):
+        pins = df['pincode']
+        if len(pins) == 0 or (pins.min() >= 0 and pins.max() <= np.iinfo(np.uint32).max):
+            df['pincode'] = pins.astype(np.uint32)
+    
+    return df
+
+
+def format_pincode(pincode: pd.Series) -> pd.Series:
+    """
+    Zero-padded 6-character string view of a numeric pincode column.
+    
+    Only the distinct pincodes are formatted; the result is a categorical
+    sharing the input's row order, so it is cheap to build on demand.
+    """
+    codes, uniques = pd.factorize(pincode)
+    labels = pd.Index(uniques).astype(str).str.zfill(6)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=labels),
+        index=pincode.index,
+        name=pincode.name,
+    )
+
+
+def _concat_chunks(dfs: list) -> pd.DataFrame:
+    """
+    Concatenate chunks, keeping categorical columns categorical.
+    
+    pd.concat falls back to object dtype when chunk categories differ, so
+    every chunk is first recoded onto the union of categories.
+    """
+    if len(dfs) > 1:
+        for col in dfs[0].columns:
+            if all(isinstance(d[col].dtype, pd.CategoricalDtype) for d in dfs if col in d):
+                categories = pd.Index([])
+                for d in dfs:
+                    categories = categories.union(d[col].cat.categories)
+                for d in dfs:
+                    d[col] = d[col].cat.set_categories(categories)
+    return pd.concat(dfs, ignore_index=True)
+
+
+def _parquet_available() -> bool:
+    """Check whether a Parquet engine is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def chunk_cache_key(file: Path,
+                    read_kwargs: Optional[dict] = None,
+                    typed: bool = True) -> str:
+    """
+    Content key for a raw chunk: hash of its path, size, mtime and read options.
+    
+    Any change to the file (or to how it is parsed) yields a new key, so a
+    stale cache entry is never reused.
+    """
+    stat = Path(file).stat()
+    parts = [
+        str(Path(file).resolve()),
+        str(stat.st_size),
+        str(stat.st_mtime_ns),
+        repr(sorted((read_kwargs or {}).items())),
+        'typed' if typed else 'raw',
+    ]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+# pd.read_csv options the arrow loader understands (on_bad_lines='skip'
+# drops malformed rows); anything else is rejected rather than ignored
+ARROW_READ_KWARGS = {'on_bad_lines'}
+
+
+def _source_fingerprint(files: List[Path],
+                        read_kwargs: Optional[dict] = None,
+                        typed: bool = True) -> str:
+    """Manifest hash of the chunks behind a frame (see metric_cache.frame_fingerprint)."""
+    return hashlib.sha1('|'.join(
+        chunk_cache_key(f, read_kwargs, typed) for f in files
+    ).encode('utf-8')).hexdigest()[:16]
+
+
+def _read_chunk(file: Path,
+                cache_dir: Optional[str] = None,
+                read_kwargs: Optional[dict] = None,
+                typed: bool = True) -> Tuple[pd.DataFrame, float, bool]:
+    """
+    Read a single CSV chunk, going through the columnar cache when enabled.
+    
+    The dataset type for the declared schema is taken from the chunk's
+    parent folder name (Enrolment, Demographic, Biometric).
+    
+    Returns the frame, the elapsed read time and whether it was a cache hit.
+    """
+    start = time.perf_counter()
+    read_kwargs = read_kwargs or {}
+    
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / file.parent.name
+        cache_key = chunk_cache_key(file, read_kwargs, typed)
+        cache_file = cache_path / f"{file.stem}-{cache_key}.parquet"
+        
+        if cache_file.exists():
+            df = pd.read_parquet(cache_file)
+            return df, time.perf_counter() - start, True
+    
+    df = pd.read_csv(file, **read_kwargs)
+    if typed:
+        df = apply_schema(df, file.parent.name)
+    
+    if cache_dir is None:
+        return df, time.perf_counter() - start, False
+    
+    cache_path.mkdir(parents=True, exist_ok=True)
+    # Drop entries for older versions of this chunk before writing the new one
+    for stale in cache_path.glob(f"{file.stem}-*.parquet"):
+        if stale.stem.rsplit('-', 1)[0] == file.stem:
+            stale.unlink()
+    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    df.to_parquet(tmp_file, index=False)
+    tmp_file.replace(cache_file)
+    
+    return df, time.perf_counter() - start, False
+
+
+@profiled(category='load')
+def load_dataset_chunks(folder_path: str,
+                        dataset_type: str,
+                        n_workers: Optional[int] = 1,
+                        executor: str = 'thread',
+                        cache_dir: Optional[str] = None,
+                        read_kwargs: Optional[dict] = None,
+                        typed: bool = True,
+                        engine: str = 'pandas',
+                        telemetry: Optional[LoadTelemetry] = None) -> pd.DataFrame:
     """
     Load and merge all CSV chunks for a given dataset type.
     
+    Chunks are read in sorted filename order and concatenated in that
+    order, so the merged frame is identical whether the files are read
+    sequentially or in parallel.
+    
+    With ``cache_dir`` set, every parsed chunk is stored as Parquet under
+    ``cache_dir/<dataset_type>/`` keyed by ``chunk_cache_key``. Unchanged
+    chunks are then read from the cache and only new or modified CSVs are
+    parsed again.
+    
+    ``engine='arrow'`` reads the chunks with the multithreaded pyarrow CSV
+    reader instead (see load_dataset_arrow). n_workers and executor do not
+    apply to that path, and there is no chunk cache: passing cache_dir
+    with engine='arrow' raises a ValueError, as do read_kwargs other than
+    ``on_bad_lines`` (ARROW_READ_KWARGS). Both paths record the same
+    ``attrs['source_fingerprint']`` for the metric result cache.
+    
     Parameters:
     -----------
     folder_path : str
         Path to the main data directory
     dataset_type : str
         One of 'Enrolment', 'Demographic', 'Biometric'
+    n_workers : int, optional
+        Number of parallel readers. 1 reads sequentially (default),
+        None uses one worker per CPU core.
+    executor : str
+        'thread' or 'process' pool used when n_workers != 1
+    cache_dir : str, optional
+        Directory for the columnar chunk cache (e.g. DEFAULT_CACHE_DIR).
+        Requires pyarrow; caching is skipped with a warning otherwise.
+    read_kwargs : dict, optional
+        Extra keyword arguments passed to pd.read_csv
+    typed : bool
+        Apply the declared DATASET_SCHEMAS at read time (default True)
+    engine : str
+        'pandas' (default) or 'arrow'
+    telemetry : LoadTelemetry, optional
+        Progress/throughput recorder; a verbose one is created if omitted
     
     Returns:
     --------
     pd.DataFrame
         Merged dataframe with all chunks
     """
+    if telemetry is None:
+        telemetry = LoadTelemetry()
+    
+    if engine == 'arrow':
+        if cache_dir is not None:
+            raise ValueError("cache_dir is not supported with engine='arrow'; "
+                             "use engine='pandas' for the chunk cache")
+        unsupported = sorted(set(read_kwargs or {}) - ARROW_READ_KWARGS)
+        if unsupported:
+            raise ValueError(f"read_kwargs {unsupported} are not supported with engine='arrow' "
+                             f"(supported: {sorted(ARROW_READ_KWARGS)}); use engine='pandas'")
+        skip_bad_lines = (read_kwargs or {}).get('on_bad_lines') == 'skip'
+        table = load_dataset_arrow(folder_path, dataset_type, typed=typed,
+                                   skip_bad_lines=skip_bad_lines, telemetry=telemetry)
+        merged_df = arrow_to_pandas(table, dataset_type if typed else None)
+        merged_df.attrs['source_fingerprint'] = _source_fingerprint(
+            sorted((Path(folder_path) / dataset_type).glob("*.csv")), read_kwargs, typed
+        )
+        return merged_df
+    if engine != 'pandas':
+        raise ValueError(f"Unknown engine: {engine}")
+    
     data_path = Path(folder_path) / dataset_type
     
     if not data_path.exists():
         raise FileNotFoundError(f"Directory not found: {data_path}")
     
-    csv_files = list(data_path.glob("*.csv"))
+    csv_files = sorted(data_path.glob("*.csv"))
     
     if not csv_files:
         raise FileNotFoundError(f"No CSV files found in {data_path}")
     
-    print(f"📂 Loading {dataset_type} dataset...")
-    print(f"   Found {len(csv_files)} files")
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Unknown executor: {executor}")
+    
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(csv_files)))
+    
+    if cache_dir is not None and not _parquet_available():
+        telemetry.warn("pyarrow not installed, chunk cache disabled")
+        cache_dir = None
+    
+    telemetry.start_dataset(dataset_type, len(csv_files),
+                            f"{n_workers} {executor} worker(s)")
+    
+    reader = partial(_read_chunk, cache_dir=cache_dir, read_kwargs=read_kwargs, typed=typed)
+    
+    if n_workers == 1:
+        results = [reader(file) for file in csv_files]
+    else:
+        pool_cls = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        with pool_cls(max_workers=n_workers) as pool:
+            # map() yields results in submission order, keeping the concat stable
+            results = list(pool.map(reader, csv_files))
     
     dfs = []
-    for file in csv_files:
-        df = pd.read_csv(file)
+    for file, (df, elapsed, cached) in zip(csv_files, results):
         dfs.append(df)
-        print(f"   ✓ Loaded {file.name}: {len(df):,} rows")
+        telemetry.file_loaded(dataset_type, file, len(df), elapsed,
+                              'cache' if cached else 'csv')
     
-    merged_df = pd.concat(dfs, ignore_index=True)
-    print(f"   📊 Total rows: {len(merged_df):,}\n")
+    merged_df = _concat_chunks(dfs)
+    # Upstream manifest for result caches (see metric_cache.frame_fingerprint)
+    merged_df.attrs['source_fingerprint'] = _source_fingerprint(csv_files, read_kwargs, typed)
+    telemetry.finish_dataset(dataset_type, len(merged_df))
     
     return merged_df
 
 
-def load_all_datasets(base_path: str) -> dict:
+@profiled(category='load')
+def load_dataset_arrow(folder_path: str,
+                       dataset_type: str,
+                       typed: bool = True,
+                       skip_bad_lines: bool = False,
+                       telemetry: Optional[LoadTelemetry] = None):
+    """
+    Load all CSV chunks for a dataset as a single Arrow table.
+    
+    Each chunk is parsed by the multithreaded pyarrow CSV reader. With
+    ``typed`` the categorical and date columns are dictionary-encoded while
+    parsing, so string cleaning later only touches the distinct values.
+    Chunks are combined with pa.concat_tables, which does not copy data.
+    
+    Parameters:
+    -----------
+    folder_path : str
+        Path to the main data directory
+    dataset_type : str
+        One of 'Enrolment', 'Demographic', 'Biometric'
+    typed : bool
+        Dictionary-encode the DATASET_SCHEMAS categorical and date columns
+    skip_bad_lines : bool
+        Drop malformed rows instead of raising
+    telemetry : LoadTelemetry, optional
+        Progress/throughput recorder; a verbose one is created if omitted
+    
+    Returns:
+    --------
+    pyarrow.Table
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        raise ImportError("pyarrow is required for the arrow loader")
+    
+    data_path = Path(folder_path) / dataset_type
+    
+    if not data_path.exists():
+        raise FileNotFoundError(f"Directory not found: {data_path}")
+    
+    csv_files = sorted(data_path.glob("*.csv"))
+    
+    if not csv_files:
+        raise FileNotFoundError(f"No CSV files found in {data_path}")
+    
+    column_types = {}
+    schema = DATASET_SCHEMAS.get(dataset_type.lower())
+    if typed and schema is not None:
+        dictionary = pa.dictionary(pa.int32(), pa.string())
+        for col in schema['categories'] + ['date']:
+            column_types[col] = dictionary
+    
+    read_options = pa_csv.ReadOptions(use_threads=True)
+    parse_options = pa_csv.ParseOptions(
+        invalid_row_handler=(lambda row: 'skip') if skip_bad_lines else None
+    )
+    convert_options = pa_csv.ConvertOptions(column_types=column_types)
+    
+    if telemetry is None:
+        telemetry = LoadTelemetry()
+    telemetry.start_dataset(dataset_type, len(csv_files), "arrow")
+    
+    tables = []
+    for file in csv_files:
+        file_start = time.perf_counter()
+        table = pa_csv.read_csv(file, read_options=read_options,
+                                parse_options=parse_options,
+                                convert_options=convert_options)
+        elapsed = time.perf_counter() - file_start
+        tables.append(table)
+        telemetry.file_loaded(dataset_type, file, table.num_rows, elapsed, 'arrow')
+    
+    merged = pa.concat_tables(tables).unify_dictionaries()
+    telemetry.finish_dataset(dataset_type, merged.num_rows)
+    
+    return merged
+
+
+def arrow_to_pandas(table, dataset_type: Optional[str] = None) -> pd.DataFrame:
+    """
+    Convert an Arrow table to pandas with as few copies as possible.
+    
+    Dictionary columns become categoricals that share the Arrow indices,
+    plain strings stay Arrow-backed (pd.ArrowDtype) and numeric columns
+    without nulls are converted zero-copy. The table's buffers are released
+    during conversion, so it must not be used afterwards.
+    
+    Parameters:
+    -----------
+    table : pyarrow.Table
+        Table from load_dataset_arrow
+    dataset_type : str, optional
+        Apply the declared schema for this dataset type after conversion
+    
+    Returns:
+    --------
+    pd.DataFrame
+    """
+    import pyarrow as pa
+    
+    string_types = {pa.string(): pd.ArrowDtype(pa.string()),
+                    pa.large_string(): pd.ArrowDtype(pa.large_string())}
+    df = table.to_pandas(split_blocks=True, self_destruct=True,
+                         types_mapper=string_types.get)
+    
+    if dataset_type is not None:
+        df = apply_schema(df, dataset_type)
+    return df
+
+
+@profiled(category='load')
+def load_all_datasets(base_path: str,
+                      n_workers: Optional[int] = 1,
+                      executor: str = 'thread',
+                      cache_dir: Optional[str] = None,
+                      read_kwargs: Optional[dict] = None,
+                      typed: bool = True,
+                      store_dir: Optional[str] = None,
+                      engine: str = 'pandas',
+                      population_path: Optional[str] = None,
+                      concurrent: bool = True,
+                      telemetry: Optional[LoadTelemetry] = None) -> dict:
     """
     Load all three datasets (Enrolment, Demographic, Biometric).
     
+    The datasets (and the population file, if given) are loaded
+    concurrently on a thread pool and report into one shared LoadTelemetry.
+    
+    With ``store_dir`` set the load is incremental: only chunks not yet in
+    the store manifest are parsed and appended to the date-partitioned
+    store, and only those new rows are returned. Merge them into existing
+    aggregates with merge_aggregate_delta, or read everything back with
+    load_store.
+    
     Parameters:
     -----------
     base_path : str
         Path to the main project directory containing data folders
+    n_workers : int, optional
+        Parallel chunk readers per dataset (see load_dataset_chunks)
+    executor : str
+        'thread' or 'process'
+    cache_dir : str, optional
+        Columnar chunk cache directory (see load_dataset_chunks); not
+        supported with engine='arrow'
+    read_kwargs : dict, optional
+        Extra keyword arguments passed to pd.read_csv
+    typed : bool
+        Apply the declared DATASET_SCHEMAS at read time (default True)
+    store_dir : str, optional
+        Incremental store root (e.g. DEFAULT_STORE_DIR). Ingestion always
+        parses with pandas into the store's typed schema, so engine,
+        cache_dir, typed, n_workers and executor must keep their defaults
+        alongside it (a ValueError is raised otherwise)
+    engine : str
+        'pandas' (default) or 'arrow' (see load_dataset_chunks)
+    population_path : str, optional
+        State population CSV to load alongside, returned as 'population'
+    concurrent : bool
+        Load the datasets in parallel (default True)
+    telemetry : LoadTelemetry, optional
+        Shared progress/throughput recorder; a verbose one is created if
+        omitted. Call telemetry.print_summary() for per-dataset throughput.
     
     Returns:
     --------
     dict
         Dictionary with keys 'enrolment', 'demographic', 'biometric'
+        (and 'population' when population_path is given)
+    """
+    if store_dir is not None:
+        overridden = [name for name, value, default in [
+            ('engine', engine, 'pandas'), ('cache_dir', cache_dir, None),
+            ('typed', typed, True), ('n_workers', n_workers, 1),
+            ('executor', executor, 'thread'),
+        ] if value != default]
+        if overridden:
+            raise ValueError(f"{', '.join(overridden)} not supported with store_dir; "
+                             "incremental ingestion reads each chunk with pandas")
+    
+    if telemetry is None:
+        telemetry = LoadTelemetry()
+    
+    def load_one(dtype: str) -> Optional[pd.DataFrame]:
+        try:
+            if store_dir is not None:
+                return ingest_new_chunks(
+                    base_path, dtype, store_dir=store_dir,
+                    read_kwargs=read_kwargs, telemetry=telemetry
+                )
+            return load_dataset_chunks(
+                base_path, dtype, n_workers=n_workers, executor=executor,
+                cache_dir=cache_dir, read_kwargs=read_kwargs, typed=typed,
+                engine=engine, telemetry=telemetry
+            )
+        except FileNotFoundError as e:
+            telemetry.warn(str(e))
+            return None
+    
+    def load_population() -> Optional[pd.DataFrame]:
+        if not Path(population_path).exists():
+            telemetry.warn(f"File not found: {population_path}")
+            return None
+        telemetry.start_dataset('Population', 1)
+        start = time.perf_counter()
+        df = pd.read_csv(population_path)
+        telemetry.file_loaded('Population', population_path, len(df),
+                              time.perf_counter() - start)
+        telemetry.finish_dataset('Population', len(df))
+        return df
+    
+    tasks = {dtype.lower(): partial(load_one, dtype)
+             for dtype in ['Enrolment', 'Demographic', 'Biometric']}
+    if population_path is not None:
+        tasks['population'] = load_population
+    
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+            futures = {name: pool.submit(task) for name, task in tasks.items()}
+            datasets = {name: future.result() for name, future in futures.items()}
+    else:
+        datasets = {name: task() for name, task in tasks.items()}
+    
+    return datasets
+
+
+@profiled(category='load')
+def stream_aggregate_dataset(folder_path: str,
+                             dataset_type: str,
+                             keys: Tuple[str, ...] = ('state', 'district', 'date'),
+                             chunksize: int = 500_000,
+                             read_kwargs: Optional[dict] = None,
+                             telemetry: Optional[LoadTelemetry] = None) -> pd.DataFrame:
+    """
+    Aggregate a dataset out-of-core into grouped sums of its count columns.
+    
+    Every CSV is read in blocks of ``chunksize`` rows and each block is
+    folded into a running (keys) -> sums frame, so peak memory is bounded by
+    one block plus the number of distinct groups, not by the input size.
+    
+    The result has the same key and count columns (plus the dataset total)
+    as the raw frame, so it can be passed straight to preprocess_dataframe
+    and to calculate_ifi / calculate_clcr / calculate_taes / calculate_ucr /
+    calculate_aaup in place of the fully loaded data. The default keys
+    cover every metric's grouping (state, district, and date for TAES).
+    
+    Parameters:
+    -----------
+    folder_path : str
+        Path to the main data directory
+    dataset_type : str
+        One of 'Enrolment', 'Demographic', 'Biometric'
+    keys : tuple
+        Columns to group by
+    chunksize : int
+        Rows per block read from each CSV
+    read_kwargs : dict, optional
+        Extra keyword arguments passed to pd.read_csv
+    telemetry : LoadTelemetry, optional
+        Progress/throughput recorder; a verbose one is created if omitted
+    
+    Returns:
+    --------
+    pd.DataFrame
+        Grouped sums, one row per distinct key combination
+    """
+    schema = DATASET_SCHEMAS[dataset_type.lower()]
+    data_path = Path(folder_path) / dataset_type
+    
+    if not data_path.exists():
+        raise FileNotFoundError(f"Directory not found: {data_path}")
+    
+    csv_files = sorted(data_path.glob("*.csv"))
+    
+    if not csv_files:
+        raise FileNotFoundError(f"No CSV files found in {data_path}")
+    
+    keys = list(keys)
+    if telemetry is None:
+        telemetry = LoadTelemetry()
+    telemetry.start_dataset(dataset_type, len(csv_files),
+                            f"streaming {chunksize:,} rows per block")
+    
+    running = None
+    rows = 0
+    for file in csv_files:
+        file_start = time.perf_counter()
+        file_rows = 0
+        for block in pd.read_csv(file, chunksize=chunksize, **(read_kwargs or {})):
+            file_rows += len(block)
+            block = apply_schema(block, dataset_type)
+            counts = [col for col in schema['counts'] if col in block.columns]
+            partial_sums = block.groupby(keys, observed=True, dropna=False)[counts].sum().reset_index()
+            
+            running = merge_aggregate_delta(running, partial_sums, keys)
+        rows += file_rows
+        telemetry.file_loaded(dataset_type, file, file_rows,
+                              time.perf_counter() - file_start, 'stream')
+    
+    counts = [col for col in schema['counts'] if col in running.columns]
+    if len(counts) == len(schema['counts']):
+        running[schema['total']] = running[counts].sum(axis=1)
+    
+    telemetry.finish_dataset(dataset_type, rows, f"{len(running):,} groups")
+    
+    return running
+
+
+@profiled(category='load')
+def stream_all_datasets(base_path: str,
+                        keys: Tuple[str, ...] = ('state', 'district', 'date'),
+                        chunksize: int = 500_000,
+                        read_kwargs: Optional[dict] = None,
+                        telemetry: Optional[LoadTelemetry] = None) -> dict:
+    """
+    Streaming counterpart of load_all_datasets.
+    
+    Returns a dictionary with keys 'enrolment', 'demographic', 'biometric'
+    holding the grouped sums from stream_aggregate_dataset.
     """
     datasets = {}
+    if telemetry is None:
+        telemetry = LoadTelemetry()
     
     for dtype in ['Enrolment', 'Demographic', 'Biometric']:
         try:
-            datasets[dtype.lower()] = load_dataset_chunks(base_path, dtype)
+            datasets[dtype.lower()] = stream_aggregate_dataset(
+                base_path, dtype, keys=keys, chunksize=chunksize,
+                read_kwargs=read_kwargs, telemetry=telemetry
+            )
         except FileNotFoundError as e:
-            print(f"⚠️ Warning: {e}")
+            telemetry.warn(str(e))
             datasets[dtype.lower()] = None
     
     return datasets
 
 
-def preprocess_dataframe(df: pd.DataFrame, dataset_type: str) -> pd.DataFrame:
+def _stratified_sample(df: pd.DataFrame,
+                       strata: List[str],
+                       fraction: float,
+                       min_per_stratum: int,
+                       rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Draw a stratified random sample of one chunk with inverse-probability weights.
+    
+    Each stratum of size N_h contributes n_h = max(min_per_stratum,
+    round(fraction * N_h)) rows (capped at N_h), chosen uniformly at random,
+    and every sampled row gets sample_weight = N_h / n_h.
+    """
+    groups = df.groupby(strata, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    sizes = np.bincount(groups)
+    n_take = np.minimum(sizes, np.maximum(min_per_stratum, np.round(sizes * fraction))).astype(np.int64)
+    
+    # Order rows by stratum, randomly within a stratum, and keep the first n_h
+    order = np.lexsort((rng.random(len(df)), groups))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(len(df)) - starts[groups[order]]
+    keep = np.sort(order[rank < n_take[groups[order]]])
+    
+    sample = df.iloc[keep].reset_index(drop=True)
+    sample['sample_weight'] = (sizes / np.maximum(n_take, 1))[groups[keep]]
+    return sample
+
+
+@profiled(category='load')
+def load_stratified_sample(folder_path: str,
+                           dataset_type: str,
+                           fraction: float = 0.05,
+                           random_seed: Optional[int] = None,
+                           strata: Tuple[str, ...] = ('state', 'date'),
+                           min_per_stratum: int = 1,
+                           cache_dir: Optional[str] = None,
+                           read_kwargs: Optional[dict] = None,
+                           telemetry: Optional[LoadTelemetry] = None) -> pd.DataFrame:
+    """
+    Load a reproducible sample of a dataset, stratified by state and date.
+    
+    Every chunk is sampled stratum by stratum as it is read, so only the
+    sample is kept in memory. Each row carries ``sample_weight`` (stratum
+    size / sampled rows); scale counts with metrics.apply_sample_weights to
+    get estimates of the full-data metrics.
+    
+    With ``cache_dir`` set, chunks are read through the columnar cache and
+    the finished sample is stored under ``cache_dir/samples/``, keyed by
+    the chunk keys and sampling parameters. Re-running a notebook cell then
+    reads only the sample.
+    
+    Parameters:
+    -----------
+    folder_path : str
+        Path to the main data directory
+    dataset_type : str
+        One of 'Enrolment', 'Demographic', 'Biometric'
+    fraction : float
+        Share of rows to keep per stratum
+    random_seed : int, optional
+        Defaults to ``random_seed`` from config.yaml
+    strata : tuple
+        Columns defining the strata
+    min_per_stratum : int
+        Minimum rows kept from every stratum, so small strata still appear
+    cache_dir : str, optional
+        Columnar cache directory (see load_dataset_chunks)
+    read_kwargs : dict, optional
+        Extra keyword arguments passed to pd.read_csv
+    telemetry : LoadTelemetry, optional
+        Progress/throughput recorder; a verbose one is created if omitted
+    
+    Returns:
+    --------
+    pd.DataFrame
+        Sampled rows with a 'sample_weight' column
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"fraction must be in (0, 1], got {fraction}")
+    
+    if random_seed is None:
+        random_seed = load_config().get('random_seed', 42)
+    
+    data_path = Path(folder_path) / dataset_type
+    
+    if not data_path.exists():
+        raise FileNotFoundError(f"Directory not found: {data_path}")
+    
+    csv_files = sorted(data_path.glob("*.csv"))
+    
+    if not csv_files:
+        raise FileNotFoundError(f"No CSV files found in {data_path}")
+    
+    if telemetry is None:
+        telemetry = LoadTelemetry()
+    
+    if cache_dir is not None and not _parquet_available():
+        telemetry.warn("pyarrow not installed, chunk cache disabled")
+        cache_dir = None
+    
+    strata = list(strata)
+    telemetry.start_dataset(dataset_type, len(csv_files),
+                            f"{fraction:.1%} stratified sample, seed {random_seed}")
+    
+    sample_file = None
+    if cache_dir is not None:
+        parts = [chunk_cache_key(f, read_kwargs) for f in csv_files]
+        parts += [repr(fraction), str(random_seed), ','.join(strata), str(min_per_stratum)]
+        sample_key = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+        sample_file = Path(cache_dir) / 'samples' / f"{dataset_type}-{sample_key}.parquet"
+        
+        if sample_file.exists():
+            start = time.perf_counter()
+            sample = pd.read_parquet(sample_file)
+            telemetry.file_loaded(dataset_type, sample_file, len(sample),
+                                  time.perf_counter() - start, 'sample-cache')
+            telemetry.finish_dataset(dataset_type, len(sample))
+            return sample
+    
+    samples = []
+    for i, file in enumerate(csv_files):
+        df, elapsed, cached = _read_chunk(file, cache_dir=cache_dir, read_kwargs=read_kwargs)
+        # One generator per chunk keeps the draw independent of read order
+        rng = np.random.default_rng([random_seed, i])
+        samples.append(_stratified_sample(df, strata, fraction, min_per_stratum, rng))
+        telemetry.file_loaded(dataset_type, file, len(df), elapsed,
+                              'cache' if cached else 'csv')
+    
+    sample = _concat_chunks(samples)
+    
+    if sample_file is not None:
+        sample_file.parent.mkdir(parents=True, exist_ok=True)
+        sample.to_parquet(sample_file, index=False)
+    
+    telemetry.finish_dataset(dataset_type, len(sample))
+    return sample
+
+
+def merge_aggregate_delta(aggregate: Optional[pd.DataFrame],
+                          delta: Optional[pd.DataFrame],
+                          keys: List[str]) -> pd.DataFrame:
+    """
+    Fold a delta of grouped sums into an existing aggregate.
+    
+    Both frames hold additive columns keyed by ``keys`` (e.g. the output of
+    stream_aggregate_dataset, or a groupby-sum of rows returned by an
+    incremental load). Rows with matching keys are summed, new keys are
+    appended. Missing key values form their own groups, so no rows drop
+    out of the totals.
+    """
+    if aggregate is None or aggregate.empty:
+        return delta
+    if delta is None or delta.empty:
+        return aggregate
+    
+    combined = _concat_chunks([aggregate.copy(), delta.copy()])
+    value_cols = [col for col in combined.columns if col not in keys]
+    return combined.groupby(list(keys), observed=True, dropna=False)[value_cols].sum().reset_index()
+
+
+def _read_manifest(dataset_path: Path) -> dict:
+    """Read a dataset's ingest manifest, or an empty one for a new store."""
+    manifest_file = dataset_path / 'manifest.json'
+    if not manifest_file.exists():
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(dataset_path: Path, manifest: dict):
+    """Atomically replace a dataset's ingest manifest."""
+    manifest_file = dataset_path / 'manifest.json'
+    tmp_file = manifest_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    tmp_file.replace(manifest_file)
+
+
+def _write_partitions(df: pd.DataFrame, dataset_path: Path, chunk_name: str) -> list:
+    """Write one chunk into date=YYYY-MM-DD partitions, returning the partitions touched."""
+    partition_keys = df['date'].dt.strftime('%Y-%m-%d').fillna('unknown')
+    partitions = []
+    for day, part in df.groupby(partition_keys, sort=True):
+        partition_dir = dataset_path / f"date={day}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        part.to_parquet(partition_dir / f"{chunk_name}.parquet", index=False)
+        partitions.append(day)
+    return partitions
+
+
+@profiled(category='load')
+def ingest_new_chunks(folder_path: str,
+                      dataset_type: str,
+                      store_dir: str = DEFAULT_STORE_DIR,
+                      read_kwargs: Optional[dict] = None,
+                      telemetry: Optional[LoadTelemetry] = None) -> pd.DataFrame:
+    """
+    Ingest only the CSV chunks that have not been seen before.
+    
+    A manifest in ``store_dir/<dataset_type>/`` records every ingested file
+    with its chunk_cache_key. Files not in the manifest are parsed with the typed
+    schema, appended to ``store_dir/<dataset_type>/date=YYYY-MM-DD/`` and
+    recorded. A file that changed after it was ingested is skipped with a
+    warning; appending it again would double count its rows.
+    
+    Parameters:
+    -----------
+    folder_path : str
+        Path to the main data directory
+    dataset_type : str
+        One of 'Enrolment', 'Demographic', 'Biometric'
+    store_dir : str
+        Root of the persisted store
+    read_kwargs : dict, optional
+        Extra keyword arguments passed to pd.read_csv
+    telemetry : LoadTelemetry, optional
+        Progress/throughput recorder; a verbose one is created if omitted
+    
+    Returns:
+    --------
+    pd.DataFrame
+        The newly ingested rows only (empty when nothing new arrived)
+    """
+    if not _parquet_available():
+        raise ImportError("pyarrow is required for the incremental store")
+    
+    data_path = Path(folder_path) / dataset_type
+    if not data_path.exists():
+        raise FileNotFoundError(f"Directory not found: {data_path}")
+    
+    dataset_path = Path(store_dir) / dataset_type
+    dataset_path.mkdir(parents=True, exist_ok=True)
+    
+    if telemetry is None:
+        telemetry = LoadTelemetry()
+    
+    # One manifest per dataset, so datasets can be ingested concurrently
+    seen = _read_manifest(dataset_path)
+    
+    new_files = []
+    for file in sorted(data_path.glob("*.csv")):
+        key = chunk_cache_key(file, read_kwargs)
+        if file.name not in seen:
+            new_files.append((file, key))
+        elif seen[file.name]['key'] != key:
+            telemetry.warn(f"{file.name} changed after ingest, skipping")
+    
+    telemetry.start_dataset(dataset_type, len(new_files),
+                            f"incremental, {len(seen)} already ingested")
+    
+    dfs = []
+    for file, key in new_files:
+        df, elapsed, _ = _read_chunk(file, read_kwargs=read_kwargs)
+        partitions = _write_partitions(df, dataset_path, file.stem)
+        seen[file.name] = {
+            'key': key,
+            'rows': len(df),
+            'partitions': partitions,
+            'ingested_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        }
+        # Record each file as soon as its partitions are on disk
+        _write_manifest(dataset_path, seen)
+        dfs.append(df)
+        telemetry.file_loaded(dataset_type, file, len(df), elapsed, 'ingest')
+    
+    delta = _concat_chunks(dfs) if dfs else pd.DataFrame()
+    telemetry.finish_dataset(dataset_type, len(delta))
+    return delta
+
+
+@profiled(category='load')
+def load_store(dataset_type: str,
+               store_dir: str = DEFAULT_STORE_DIR,
+               dates: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load a dataset from the incremental store.
+    
+    Parameters:
+    -----------
+    dataset_type : str
+        One of 'Enrolment', 'Demographic', 'Biometric'
+    store_dir : str
+        Root of the persisted store
+    dates : list, optional
+        'YYYY-MM-DD' partitions to read; all partitions when omitted
+    
+    Returns:
+    --------
+    pd.DataFrame
+    """
+    dataset_path = Path(store_dir) / dataset_type
+    if dates is None:
+        files = sorted(dataset_path.glob("date=*/*.parquet"))
+    else:
+        files = sorted(f for day in dates for f in (dataset_path / f"date={day}").glob("*.parquet"))
+    
+    if not files:
+        raise FileNotFoundError(f"No stored partitions found in {dataset_path}")
+    
+    return _concat_chunks([pd.read_parquet(f) for f in files])
+
+
+def _standardize_text(values: pd.Series) -> pd.Series:
+    """
+    Strip and title-case a text column.
+    
+    Categorical columns are cleaned on their categories only and recoded,
+    merging categories that collapse to the same cleaned name.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.str.strip().str.title()
+    
+    cleaned = pd.Index(values.cat.categories.astype(str)).str.strip().str.title()
+    categories = cleaned.unique().sort_values()
+    remap = np.append(categories.get_indexer(cleaned), -1)
+    codes = remap[values.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories),
+        index=values.index,
+        name=values.name,
+    )
+
+
+@profiled(category='load')
+def preprocess_dataframe(df: pd.DataFrame,
+                         dataset_type: str,
+                         temporal_features: Optional[List[str]] = None,
+                         resolver=None) -> pd.DataFrame:
     """
     Clean and preprocess a dataframe.
     
+    Calendar features (year, month, weekday, is_weekend, ...) are derived
+    lazily through temporal_feature() when a caller first needs them; pass
+    ``temporal_features`` to materialize some of them immediately.
+    
     Parameters:
     -----------
     df : pd.DataFrame
         Raw dataframe
     dataset_type : str
         One of 'enrolment', 'demographic', 'biometric'
+    temporal_features : list, optional
+        Calendar features to add eagerly (keys of CALENDAR_FEATURES)
+    resolver : state_mapping.NameResolver, optional
+        Resolves state and district spellings to the canonical gazetteer
+        names after cleaning; new spellings are resolved once and cached
     
     Returns:
     --------
@@ -97,29 +1221,24 @@ def preprocess_dataframe(df: pd.DataFrame, dataset_type: str) -> pd.DataFrame:
     """
     df = df.copy()
     
-    # Parse date column
+    # Parse date column (already parsed when loaded with the typed schema)
     if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
+        df['date'] = parse_dates(df['date'])
         
-        # Extract temporal features
-        df['year'] = df['date'].dt.year
-        df['month'] = df['date'].dt.month
-        df['month_name'] = df['date'].dt.month_name()
-        df['day'] = df['date'].dt.day
-        df['weekday'] = df['date'].dt.day_name()
-        df['week_of_year'] = df['date'].dt.isocalendar().week
-        df['is_weekend'] = df['date'].dt.dayofweek >= 5
-    
-    # Standardize state names
-    if 'state' in df.columns:
-        df['state'] = df['state'].str.strip().str.title()
-    
-    # Standardize district names
-    if 'district' in df.columns:
-        df['district'] = df['district'].str.strip().str.title()
-    
-    # Ensure pincode is string
-    if 'pincode' in df.columns:
+        for feature in temporal_features or []:
+            temporal_feature(df, feature)
+    
+    # Standardize state and district names
+    for col in ['state', 'district']:
+        if col in df.columns:
+            df[col] = _standardize_text(df[col])
+    
+    if resolver is not None and 'state' in df.columns:
+        resolver.resolve_frame(df, inplace=True)
+    
+    # Numeric pincodes stay compact (uint32); use format_pincode() for the
+    # zero-padded string view. Non-numeric pincodes are padded as before.
+    if 'pincode' in df.columns and not pd.api.types.is_integer_dtype(df['pincode']):
         df['pincode'] = df['pincode'].astype(str).str.zfill(6)
     
     # Add total column based on dataset type
@@ -138,39 +1257,146 @@ def preprocess_dataframe(df: pd.DataFrame, dataset_type: str) -> pd.DataFrame:
     return df
 
 
-def get_data_summary(df: pd.DataFrame, name: str) -> dict:
+# Columns whose distinct counts are reported by get_data_summary
+SUMMARY_DISTINCT_COLUMNS = {
+    'state': 'unique_states',
+    'district': 'unique_districts',
+    'pincode': 'unique_pincodes',
+}
+
+# Rows sampled per object column when estimating deep memory usage
+MEMORY_SAMPLE_SIZE = 10_000
+
+
+def _hll_estimate(hashes: np.ndarray, precision: int = 14) -> int:
+    """
+    HyperLogLog distinct-count estimate from 64-bit hashes.
+    
+    Uses 2**precision registers (standard error ~1.04 / sqrt(2**precision),
+    about 0.8% at the default) with the small-range correction.
+    """
+    m = 1 << precision
+    if len(hashes) == 0:
+        return 0
+    
+    hashes = hashes.astype(np.uint64, copy=False)
+    register = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << (64 - precision)) - 1)
+    # rank = position of the leftmost 1-bit in the remaining 64 - p bits
+    bit_length = np.frexp(remainder.astype(np.float64))[1]
+    rank = (64 - precision - bit_length + 1).astype(np.uint8)
+    
+    registers = np.zeros(m, dtype=np.uint8)
+    np.maximum.at(registers, register, rank)
+    
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros > 0:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+
+def _column_memory(values: pd.Series, approximate: bool) -> int:
+    """Deep memory of a column; object columns are sampled when approximate."""
+    if not approximate or values.dtype != object or len(values) <= MEMORY_SAMPLE_SIZE:
+        return int(values.memory_usage(deep=True, index=False))
+    
+    shallow = int(values.memory_usage(deep=False, index=False))
+    sample = values.sample(MEMORY_SAMPLE_SIZE, random_state=0)
+    per_row = (sample.memory_usage(deep=True, index=False)
+               - sample.memory_usage(deep=False, index=False)) / len(sample)
+    return int(shallow + per_row * len(values))
+
+
+def get_data_summary(df: pd.DataFrame,
+                     name: str,
+                     approximate: bool = False,
+                     hll_precision: int = 14) -> dict:
     """
     Generate a summary of the dataframe.
     
+    All statistics come from a single pass over the columns. In exact mode
+    each column is factorized once; the codes give its missing count and
+    distinct count, and they are folded into a row id whose distinct count
+    gives the exact number of duplicate rows. In approximate mode each
+    column is hashed once instead. Distinct counts are HyperLogLog estimates
+    over the column hashes, duplicates are counted on combined 64-bit row
+    hashes, and object-column memory is estimated from a sample.
+    
     Parameters:
     -----------
     df : pd.DataFrame
         Dataframe to summarize
     name : str
         Name of the dataset
+    approximate : bool
+        Use hash/HyperLogLog estimates instead of exact counts
+    hll_precision : int
+        HyperLogLog register bits for approximate mode
     
     Returns:
     --------
     dict
         Summary statistics
     """
+    n_rows = len(df)
+    missing = 0
+    memory = int(df.index.memory_usage(deep=True))
+    distinct = {}
+    date_range = None
+    row_key = np.zeros(n_rows, dtype=np.uint64 if approximate else np.int64)
+    
+    for col in df.columns:
+        values = df[col]
+        memory += _column_memory(values, approximate)
+        
+        if approximate:
+            is_null = values.isna().to_numpy()
+            hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+            # Same mixing step pandas uses to combine per-column hashes
+            row_key = (row_key * np.uint64(1000003)) ^ hashes
+            if col in SUMMARY_DISTINCT_COLUMNS:
+                distinct[col] = _hll_estimate(hashes[~is_null], hll_precision)
+            uniques = None
+        else:
+            codes, uniques = pd.factorize(values)
+            is_null = codes < 0
+            # Keep the combined key dense so it never overflows int64
+            row_key, _ = pd.factorize(row_key * (len(uniques) + 1) + (codes + 1))
+            if col in SUMMARY_DISTINCT_COLUMNS:
+                distinct[col] = len(uniques)
+        
+        missing += int(is_null.sum())
+        
+        if col == 'date' and pd.api.types.is_datetime64_any_dtype(values):
+            dates = pd.DatetimeIndex(uniques) if uniques is not None else values
+            date_range = f"{dates.min()} to {dates.max()}"
+    
+    if n_rows == 0:
+        unique_rows = 0
+    elif approximate:
+        # Distinct 64-bit row hashes: exact up to (negligible) hash collisions
+        unique_rows = len(pd.unique(row_key))
+    else:
+        unique_rows = int(row_key.max()) + 1 if len(df.columns) else 1
+    
     summary = {
         'name': name,
-        'rows': len(df),
+        'rows': n_rows,
         'columns': len(df.columns),
-        'missing_values': df.isnull().sum().sum(),
-        'duplicates': df.duplicated().sum(),
-        'memory_mb': df.memory_usage(deep=True).sum() / 1024 / 1024,
+        'missing_values': missing,
+        'duplicates': n_rows - unique_rows,
+        'memory_mb': memory / 1024 / 1024,
+        'approximate': approximate,
     }
     
-    if 'date' in df.columns and pd.api.types.is_datetime64_any_dtype(df['date']):
-        summary['date_range'] = f"{df['date'].min()} to {df['date'].max()}"
-    
-    if 'state' in df.columns:
-        summary['unique_states'] = df['state'].nunique()
+    if date_range is not None:
+        summary['date_range'] = date_range
     
-    if 'district' in df.columns:
-        summary['unique_districts'] = df['district'].nunique()
+    for col, key in SUMMARY_DISTINCT_COLUMNS.items():
+        if col in distinct:
+            summary[key] = distinct[col]
     
     return summary
 
@@ -178,7 +1404,8 @@ def get_data_summary(df: pd.DataFrame, name: str) -> dict:
 def print_data_summary(summary: dict):
     """Print formatted data summary."""
     print(f"\n{'='*50}")
-    print(f"📊 {summary['name'].upper()} DATASET SUMMARY")
+    mode = " (APPROXIMATE)" if summary.get('approximate') else ""
+    print(f"📊 {summary['name'].upper()} DATASET SUMMARY{mode}")
     print(f"{'='*50}")
     print(f"  Rows:           {summary['rows']:,}")
     print(f"  Columns:        {summary['columns']}")
@@ -192,4 +1419,6 @@ def print_data_summary(summary: dict):
         print(f"  Unique States:  {summary['unique_states']}")
     if 'unique_districts' in summary:
         print(f"  Unique Districts: {summary['unique_districts']}")
+    if 'unique_pincodes' in summary:
+        print(f"  Unique Pincodes: {summary['unique_pincodes']:,}")
     print(f"{'='*50}\n")
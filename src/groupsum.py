@@ -0,0 +1,200 @@
+"""
+Factorized Group Aggregation
+============================
+A small engine for the grouped sums behind the metrics.
+
+Group keys of several frames are factorized once into integer codes over
+a shared dictionary. Sums, counts and means are then np.bincount calls
+into arrays aligned by group position, so frames combine by position
+instead of through groupby(...).reset_index() followed by merge.
+
+Example
+-------
+>>> groups = GroupCodes([enrolment_df, biometric_df], 'state')
+>>> enrolments = groups.sum(0, ['age_5_17'])[:, 0]
+>>> child_bio = groups.sum(1, ['bio_age_5_17'])[:, 0]
+>>> clcr = child_bio / (enrolments * 0.20)
+"""
+
+import pandas as pd
+import numpy as np
+from typing import List, Sequence, Union
+
+
+def _factorize(col: pd.Series):
+    """Codes and uniques of a key column; categoricals reuse their own codes."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(dtype=np.int64), col.cat.categories
+    codes, uniques = pd.factorize(col)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+def _factorize_shared(columns: List[pd.Series]):
+    """
+    Factorize one key column of several frames over a shared dictionary.
+
+    Each frame is factorized on its own (free for categoricals, which
+    already carry codes), then the per-frame uniques are unified and the
+    codes remapped. Missing values get code -1.
+
+    Returns
+    -------
+    Tuple of (list of code arrays, sorted uniques as an Index)
+    """
+    per_frame = [_factorize(col) for col in columns]
+    uniques = per_frame[0][1].append([u for _, u in per_frame[1:]])
+    shared_codes, shared_uniques = pd.factorize(uniques)
+
+    # Renumber so that code order follows sorted key order, as groupby does
+    order = shared_uniques.argsort()
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    codes, offset = [], 0
+    for frame_codes, frame_uniques in per_frame:
+        # Trailing -1 entry maps missing values to -1
+        mapping = np.append(rank[shared_codes[offset:offset + len(frame_uniques)]], -1)
+        offset += len(frame_uniques)
+        codes.append(mapping[frame_codes])
+
+    return codes, shared_uniques.take(order)
+
+
+class GroupCodes:
+    """
+    Shared integer group codes for the rows of several frames.
+
+    Groups are the observed key combinations across all frames, sorted by
+    key; rows with a missing key are left out, as in groupby. All results
+    are aligned to the same group positions (see keys()).
+
+    Parameters
+    ----------
+    frames : DataFrames sharing the key columns
+    keys : Key column name or list of names
+    """
+
+    def __init__(self, frames: Sequence[pd.DataFrame], keys: Union[str, List[str]]):
+        self.frames = list(frames)
+        self.key_names = [keys] if isinstance(keys, str) else list(keys)
+        self._lengths = [len(df) for df in self.frames]
+
+        combined = [None] * len(self.frames)
+        missing = [None] * len(self.frames)
+        key_uniques = []
+
+        # Mixed-radix combination of the per-key codes; sorted per-key codes
+        # keep the combined code in lexicographic key order
+        for name in self.key_names:
+            codes, uniques = _factorize_shared([df[name] for df in self.frames])
+            key_uniques.append(uniques)
+            for i, frame_codes in enumerate(codes):
+                if combined[i] is None:
+                    combined[i] = frame_codes
+                else:
+                    combined[i] = combined[i] * len(uniques) + frame_codes
+                is_missing = frame_codes < 0
+                if is_missing.any():
+                    missing[i] = is_missing if missing[i] is None else missing[i] | is_missing
+
+        # Compress the combined codes to the observed combinations, in order.
+        # A dense lookup table over the code space avoids hashing rows when
+        # the space is small relative to the data (the usual case).
+        space = int(np.prod([len(u) for u in key_uniques], dtype=np.float64))
+        if space <= max(4 * sum(self._lengths), 1 << 16):
+            for i, frame_missing in enumerate(missing):
+                if frame_missing is not None:
+                    combined[i] = np.where(frame_missing, space, combined[i])
+            seen = np.zeros(space + 1, dtype=bool)
+            for frame_combined in combined:
+                seen[frame_combined] = True
+            observed = np.flatnonzero(seen[:space])
+            lookup = np.full(space + 1, -1, dtype=np.int64)
+            lookup[observed] = np.arange(len(observed))
+            self.codes = [lookup[frame_combined] for frame_combined in combined]
+        else:
+            valid = np.concatenate([
+                np.ones(n, dtype=bool) if m is None else ~m
+                for n, m in zip(self._lengths, missing)
+            ])
+            group_codes, observed = pd.factorize(np.concatenate(combined)[valid])
+            order = np.argsort(observed)
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            observed = observed[order]
+
+            all_codes = np.full(len(valid), -1, dtype=np.int64)
+            all_codes[valid] = rank[group_codes]
+            self.codes = np.split(all_codes, np.cumsum(self._lengths)[:-1])
+
+        # Rows with a missing key are dropped once, up front
+        self._valid = [None if m is None else ~m for m in missing]
+        self._valid_codes = [
+            codes if valid is None else codes[valid]
+            for codes, valid in zip(self.codes, self._valid)
+        ]
+        self._counts = {}
+
+        self.n_groups = len(observed)
+
+        # Decode the observed combinations back to key values
+        self._key_values = {}
+        remainder = observed
+        for name, uniques in reversed(list(zip(self.key_names, key_uniques))):
+            self._key_values[name] = uniques.take(remainder % len(uniques))
+            remainder = remainder // len(uniques)
+
+    def keys(self) -> pd.DataFrame:
+        """Key values of every group, one row per group position."""
+        keys = pd.DataFrame({name: self._key_values[name] for name in self.key_names})
+        for name in self.key_names:
+            # Keep categorical keys categorical, as groupby returns them
+            if any(isinstance(df[name].dtype, pd.CategoricalDtype) for df in self.frames):
+                keys[name] = keys[name].astype('category')
+        return keys
+
+    def _bincount(self, frame: int, weights=None) -> np.ndarray:
+        valid = self._valid[frame]
+        if weights is not None and valid is not None:
+            weights = weights[valid]
+        return np.bincount(self._valid_codes[frame], weights=weights, minlength=self.n_groups)
+
+    def count(self, frame: int) -> np.ndarray:
+        """Number of rows of a frame in each group."""
+        if frame not in self._counts:
+            self._counts[frame] = self._bincount(frame)
+        return self._counts[frame]
+
+    def present(self, frame: int) -> np.ndarray:
+        """Whether each group has rows in a frame (the groups groupby would return)."""
+        return self.count(frame) > 0
+
+    def sum(self, frame: int, columns: List[str]) -> np.ndarray:
+        """
+        Per-group sums of columns of a frame, shape (n_groups, len(columns)).
+
+        Integer columns give int64 sums (exact up to 2**53), other columns
+        float64. Missing values count as 0, as in groupby().sum().
+        """
+        df = self.frames[frame]
+        sums = np.empty((self.n_groups, len(columns)))
+        for j, col in enumerate(columns):
+            values = df[col].to_numpy(dtype=np.float64, na_value=0.0)
+            sums[:, j] = self._bincount(frame, values)
+
+        if all(pd.api.types.is_integer_dtype(df[col]) for col in columns):
+            return sums.astype(np.int64)
+        return sums
+
+    def mean(self, frame: int, columns: List[str]) -> np.ndarray:
+        """Per-group means of columns of a frame, skipping missing values (NaN for empty groups)."""
+        df = self.frames[frame]
+        means = np.empty((self.n_groups, len(columns)))
+        for j, col in enumerate(columns):
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(values)
+            total = self._bincount(frame, np.where(valid, values, 0.0))
+            count = self._bincount(frame, valid.astype(np.float64))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                means[:, j] = total / count
+        return means
@@ -0,0 +1,242 @@
+"""
+Metric Result Cache
+===================
+Memoization for the metric functions in src/metrics.py.
+
+A call is keyed by the function name, a cheap fingerprint of every input
+frame and the remaining arguments. Results are kept in memory with LRU
+eviction and, optionally, pickled to disk so they survive kernel restarts.
+Caching is off until enable_metric_cache() is called; disabled, the
+decorated functions behave exactly as before.
+
+Example
+-------
+>>> from src.metric_cache import enable_metric_cache, METRIC_CACHE
+>>> enable_metric_cache(max_entries=256, cache_dir='data/processed/metric_cache')
+>>> calculate_ifi(enrol, demo, bio)      # computed
+>>> calculate_ifi(enrol, demo, bio)      # served from cache
+>>> METRIC_CACHE.stats()
+{'hits': 1, 'misses': 1, 'disk_hits': 0, 'evictions': 0, 'entries': 1}
+"""
+
+import copy
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+import numpy as np
+
+from .utils import logger
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+FINGERPRINT_SAMPLE_ROWS = 1024
+
+
+def frame_fingerprint(df: pd.DataFrame, sample_rows: int = FINGERPRINT_SAMPLE_ROWS) -> str:
+    """
+    Cheap content fingerprint of a DataFrame (or Series).
+
+    Combines shape, columns and dtypes, the upstream file manifest when the
+    loader recorded one (``df.attrs['source_fingerprint']``), a hash of up
+    to ``sample_rows`` evenly spaced rows, and one full pass per column:
+    numeric and categorical code columns are summed, other (object and
+    string) columns are hashed in full through their factorized codes and
+    hashed distinct values. Any change to a text column changes the
+    fingerprint; a numeric edit outside the sample that keeps the column
+    sum (e.g. values permuted within the column) can still collide.
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, list(df.columns), [str(t) for t in df.dtypes])).encode('utf-8'))
+
+    source = df.attrs.get('source_fingerprint')
+    if source:
+        digest.update(str(source).encode('utf-8'))
+
+    if len(df):
+        positions = np.unique(np.linspace(0, len(df) - 1, min(len(df), sample_rows)).astype(np.int64))
+        sample = df.iloc[positions]
+        digest.update(pd.util.hash_pandas_object(sample, index=True).to_numpy().tobytes())
+
+        for col in df.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                total = values.cat.codes.to_numpy().sum(dtype=np.int64)
+            elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                total = values.to_numpy(dtype=np.float64, na_value=0.0).sum()
+            else:
+                # Text columns: every row's code plus the hashed distinct values
+                codes, uniques = pd.factorize(values)
+                digest.update(codes.tobytes())
+                digest.update(pd.util.hash_array(np.asarray(uniques, dtype=object)).tobytes())
+                continue
+            digest.update(np.float64(total).tobytes())
+
+    return digest.hexdigest()
+
+
+def _argument_token(value: Any) -> str:
+    """Stable token for one call argument: fingerprint for frames, repr otherwise."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return 'frame:' + frame_fingerprint(value)
+    if isinstance(value, np.ndarray):
+        return 'array:' + hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{k!r}:{_argument_token(v)}' for k, v in sorted(value.items(), key=repr)) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_argument_token(v) for v in value) + ']'
+    return repr(value)
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class MetricCache:
+    """
+    LRU cache of metric results with optional on-disk persistence.
+
+    Hits return a deep copy, so callers can modify results freely without
+    corrupting the cached entry.
+
+    Parameters
+    ----------
+    max_entries : Results kept in memory before the least recently used is evicted
+    cache_dir : Directory for pickled results (None = memory only)
+    enabled : Whether memoize()d functions consult the cache
+    """
+
+    def __init__(self, max_entries: int = 128, cache_dir: Optional[str] = None, enabled: bool = True):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def key(self, func_name: str, arguments: dict) -> str:
+        """Cache key of a call from its bound arguments."""
+        parts = [func_name] + [f'{k}={_argument_token(v)}' for k, v in arguments.items()]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f'{key}.pkl' if self.cache_dir is not None else None
+
+    def get(self, key: str):
+        """Cached result for a key, or None (counts a hit or a miss)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+
+        path = self._disk_path(key)
+        if path is not None and path.exists():
+            try:
+                value = pd.read_pickle(path)
+            except Exception as e:
+                logger.warning(f"Unreadable metric cache entry {path.name}: {e}")
+            else:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value):
+        """Store a result in memory (and on disk when a cache_dir is set)."""
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+
+        path = self._disk_path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            pd.to_pickle(value, tmp)
+            tmp.replace(path)
+
+    def _remember(self, key: str, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, disk: bool = False):
+        """Drop all in-memory entries (and pickled ones with disk=True) and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = self.evictions = 0
+        if disk and self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.pkl'):
+                path.unlink()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and the number of entries in memory."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+            }
+
+    def memoize(self, func):
+        """Decorator routing calls through the cache while it is enabled."""
+        signature = inspect.signature(func)
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+
+            # Bind so positional, keyword and defaulted spellings share a key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = self.key(name, bound.arguments)
+            result = self.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                self.put(key, result)
+            return result
+        return wrapper
+
+
+# Shared cache behind the metric functions; disabled until enabled explicitly
+METRIC_CACHE = MetricCache(enabled=False)
+
+
+def enable_metric_cache(max_entries: int = 128, cache_dir: Optional[str] = None) -> MetricCache:
+    """Turn on memoization of the metric functions and return the shared cache."""
+    METRIC_CACHE.max_entries = max_entries
+    METRIC_CACHE.cache_dir = Path(cache_dir) if cache_dir is not None else None
+    METRIC_CACHE.enabled = True
+    return METRIC_CACHE
+
+
+def disable_metric_cache(clear: bool = True):
+    """Turn memoization off again, dropping the in-memory entries by default."""
+    METRIC_CACHE.enabled = False
+    if clear:
+        METRIC_CACHE.clear()
@@ -13,15 +13,163 @@ Metrics:
 
 import pandas as pd
 import numpy as np
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 import warnings
 warnings.filterwarnings('ignore')
 
+from .data_loader import DATASET_SCHEMAS, parse_dates, calendar_feature
+from .utils import load_config, profiled
+from .groupsum import GroupCodes
+from .metric_cache import METRIC_CACHE
+
+
+# =============================================================================
+# SAMPLE WEIGHTING
+# =============================================================================
+
+# Additive count columns of the three datasets (including derived totals)
+COUNT_COLUMNS = [
+    'age_0_5', 'age_5_17', 'age_18_greater', 'total_enrolments',
+    'demo_age_5_17', 'demo_age_17_', 'total_demo_updates',
+    'bio_age_5_17', 'bio_age_17_', 'total_bio_updates',
+]
+
+
+def apply_sample_weights(
+    df: pd.DataFrame,
+    weight_col: str = 'sample_weight'
+) -> pd.DataFrame:
+    """
+    Scale count columns of a weighted sample to full-population estimates.
+    
+    Every count is multiplied by its row's inverse-inclusion weight (see
+    data_loader.load_stratified_sample). Because all metrics are built from
+    grouped sums, passing the scaled frame to any metric function yields a
+    scaled (Horvitz-Thompson) estimate of the full-data metric.
+    
+    Parameters
+    ----------
+    df : Sampled DataFrame with a weight column
+    weight_col : Name of the weight column
+    
+    Returns
+    -------
+    DataFrame with float count columns scaled by the weights
+    """
+    result = df.copy()
+    weights = result[weight_col].to_numpy(dtype=np.float64)
+    for col in COUNT_COLUMNS:
+        if col in result.columns:
+            result[col] = result[col].to_numpy(dtype=np.float64) * weights
+    return result
+
+
+# =============================================================================
+# SHARED AGGREGATION CUBE
+# =============================================================================
+
+@profiled(category='metric')
+def build_metric_cube(
+    df: pd.DataFrame,
+    dataset_type: str,
+    keys: Tuple[str, ...] = ('state', 'district')
+) -> pd.DataFrame:
+    """
+    Sum all count columns of one dataset at (keys, date, weekend).
+    
+    Every metric is a grouped sum over a subset of these keys, so the cube
+    can stand in for the raw frame in any metric function: re-aggregating
+    it gives the same result while touching a few thousand rows instead of
+    millions.
+    
+    Parameters
+    ----------
+    df : Raw or preprocessed DataFrame of one dataset
+    dataset_type : 'enrolment', 'demographic' or 'biometric'
+    keys : Geographic grouping columns (default state and district, the
+        finest grain the state-level metrics need)
+    
+    Returns
+    -------
+    DataFrame keyed by keys, date and is_weekend with the age columns and
+    the dataset total
+    """
+    schema = DATASET_SCHEMAS[dataset_type.lower()]
+    value_cols = [c for c in schema['counts'] if c in df.columns]
+    if schema['total'] in df.columns:
+        value_cols.append(schema['total'])
+    
+    dates = parse_dates(df['date']).rename('date')
+    
+    # dropna=False keeps rows with unparseable dates in the totals, as the
+    # per-metric groupbys on the raw frame did
+    cube = df[value_cols].groupby(
+        [df[k] for k in keys] + [dates],
+        observed=True, dropna=False
+    ).sum().reset_index()
+    
+    # The weekend flag is a function of the date, so it is derived on the
+    # (much smaller) cube rather than grouped on
+    cube['is_weekend'] = calendar_feature(cube['date'], 'is_weekend')
+    
+    if schema['total'] not in cube.columns:
+        cube[schema['total']] = cube[schema['counts']].sum(axis=1)
+    
+    return cube
+
+
+@profiled(category='metric')
+def build_metric_cubes(
+    enrolment_df: pd.DataFrame,
+    demographic_df: pd.DataFrame,
+    biometric_df: pd.DataFrame
+) -> dict:
+    """
+    Build the aggregation cube of each dataset with a single scan apiece.
+    
+    Returns
+    -------
+    Dict with 'enrolment', 'demographic' and 'biometric' cubes
+    """
+    return {
+        'enrolment': build_metric_cube(enrolment_df, 'enrolment'),
+        'demographic': build_metric_cube(demographic_df, 'demographic'),
+        'biometric': build_metric_cube(biometric_df, 'biometric'),
+    }
+
+
+# Status column, bin edges and labels of each core metric
+METRIC_BANDS = {
+    'ifi': ('ifi_risk', [-np.inf, 0.20, 0.40, 0.60, np.inf],
+             ['Critical', 'At Risk', 'Healthy', 'Optimal']),
+    'clcr': ('clcr_status', [-np.inf, 0.50, 0.80, 1.00, np.inf],
+             ['Critical Gap', 'Below Target', 'On Track', 'Exceeding']),
+    'taes': ('taes_status', [-np.inf, 0.50, 0.70, 0.90, np.inf],
+             ['Severe Inequity', 'Moderate Inequity', 'Acceptable', 'Equitable']),
+    'ucr': ('ucr_status', [-np.inf, 0.50, 0.75, 0.90, np.inf],
+             ['Poor Coverage', 'Partial', 'Good', 'Excellent']),
+    'aaup': ('aaup_status', [-np.inf, 0.50, 0.80, 1.20, np.inf],
+             ['Severely Under', 'Under', 'Normal', 'Over']),
+}
+
+
+def categorize_metric(values: pd.Series, metric: str) -> pd.Series:
+    """Bin metric values into the status categories of METRIC_BANDS."""
+    _, bins, labels = METRIC_BANDS[metric]
+    return pd.cut(values, bins=bins, labels=labels)
+
+
+def _group_keys(group_by) -> list:
+    """Normalise a group_by argument (column name or list of names) to a list."""
+    return [group_by] if isinstance(group_by, str) else list(group_by)
+
 
 # =============================================================================
 # METRIC 1: Identity Freshness Index (IFI)
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_ifi(
     enrolment_df: pd.DataFrame,
     demographic_df: pd.DataFrame,
@@ -38,47 +186,25 @@ def calculate_ifi(
     enrolment_df : DataFrame with enrolment data
     demographic_df : DataFrame with demographic update data
     biometric_df : DataFrame with biometric update data
-    group_by : 'state' or 'district' level aggregation
+    group_by : 'state' or 'district' level aggregation, or a list of key columns
     
     Returns
     -------
     DataFrame with IFI scores and risk categories
     """
-    # Aggregate enrolments
-    if 'total_enrolments' not in enrolment_df.columns:
-        enrolment_df = enrolment_df.copy()
-        enrolment_df['total_enrolments'] = (
-            enrolment_df['age_0_5'] + 
-            enrolment_df['age_5_17'] + 
-            enrolment_df['age_18_greater']
-        )
-    
-    enrol_agg = enrolment_df.groupby(group_by)['total_enrolments'].sum().reset_index()
-    
-    # Aggregate demographic updates
-    if 'total_demo_updates' not in demographic_df.columns:
-        demographic_df = demographic_df.copy()
-        demographic_df['total_demo_updates'] = (
-            demographic_df['demo_age_5_17'] + 
-            demographic_df['demo_age_17_']
-        )
+    # Factorize the keys of all three frames once; sums align by group position
+    groups = GroupCodes([enrolment_df, demographic_df, biometric_df], group_by)
     
-    demo_agg = demographic_df.groupby(group_by)['total_demo_updates'].sum().reset_index()
+    # Enrolment groups form the base table (left join of the update totals)
+    base = groups.present(0)
+    result = groups.keys()[base].reset_index(drop=True)
     
-    # Aggregate biometric updates
-    if 'total_bio_updates' not in biometric_df.columns:
-        biometric_df = biometric_df.copy()
-        biometric_df['total_bio_updates'] = (
-            biometric_df['bio_age_5_17'] + 
-            biometric_df['bio_age_17_']
-        )
-    
-    bio_agg = biometric_df.groupby(group_by)['total_bio_updates'].sum().reset_index()
-    
-    # Merge all
-    result = enrol_agg.merge(demo_agg, on=group_by, how='left')
-    result = result.merge(bio_agg, on=group_by, how='left')
-    result = result.fillna(0)
+    for frame, dataset in enumerate(['enrolment', 'demographic', 'biometric']):
+        schema = DATASET_SCHEMAS[dataset]
+        df = groups.frames[frame]
+        # Totals are sums of the age columns when not precomputed
+        columns = [schema['total']] if schema['total'] in df.columns else schema['counts']
+        result[schema['total']] = groups.sum(frame, columns).sum(axis=1)[base]
     
     # Calculate IFI
     result['total_updates'] = result['total_demo_updates'] + result['total_bio_updates']
@@ -86,11 +212,7 @@ def calculate_ifi(
     result['ifi'] = result['ifi'].fillna(0)
     
     # Categorize risk
-    result['ifi_risk'] = pd.cut(
-        result['ifi'],
-        bins=[-np.inf, 0.20, 0.40, 0.60, np.inf],
-        labels=['Critical', 'At Risk', 'Healthy', 'Optimal']
-    )
+    result['ifi_risk'] = categorize_metric(result['ifi'], 'ifi')
     
     return result.sort_values('ifi', ascending=True)
 
@@ -99,6 +221,8 @@ def calculate_ifi(
 # METRIC 2: Child Lifecycle Capture Rate (CLCR)
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_clcr(
     enrolment_df: pd.DataFrame,
     biometric_df: pd.DataFrame,
@@ -116,7 +240,7 @@ def calculate_clcr(
     ----------
     enrolment_df : DataFrame with enrolment data
     biometric_df : DataFrame with biometric update data
-    group_by : 'state' or 'district' level aggregation
+    group_by : 'state' or 'district' level aggregation, or a list of key columns
     expected_annual_update_rate : Expected % of children updating per year (default 20%)
     
     Returns
@@ -124,12 +248,12 @@ def calculate_clcr(
     DataFrame with CLCR scores
     """
     # Aggregate child enrolments
-    enrol_child = enrolment_df.groupby(group_by)['age_5_17'].sum().reset_index()
-    enrol_child.columns = [group_by, 'child_enrolments']
+    enrol_child = enrolment_df.groupby(group_by, observed=True)['age_5_17'].sum().reset_index()
+    enrol_child = enrol_child.rename(columns={'age_5_17': 'child_enrolments'})
     
     # Aggregate child biometric updates
-    bio_child = biometric_df.groupby(group_by)['bio_age_5_17'].sum().reset_index()
-    bio_child.columns = [group_by, 'child_bio_updates']
+    bio_child = biometric_df.groupby(group_by, observed=True)['bio_age_5_17'].sum().reset_index()
+    bio_child = bio_child.rename(columns={'bio_age_5_17': 'child_bio_updates'})
     
     # Merge
     result = enrol_child.merge(bio_child, on=group_by, how='left')
@@ -141,11 +265,7 @@ def calculate_clcr(
     result['clcr'] = result['clcr'].fillna(0)
     
     # Categorize
-    result['clcr_status'] = pd.cut(
-        result['clcr'],
-        bins=[-np.inf, 0.50, 0.80, 1.00, np.inf],
-        labels=['Critical Gap', 'Below Target', 'On Track', 'Exceeding']
-    )
+    result['clcr_status'] = categorize_metric(result['clcr'], 'clcr')
     
     return result.sort_values('clcr', ascending=True)
 
@@ -154,6 +274,8 @@ def calculate_clcr(
 # METRIC 3: Temporal Access Equity Score (TAES)
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_taes(
     df: pd.DataFrame,
     value_col: str = 'total_enrolments',
@@ -170,29 +292,31 @@ def calculate_taes(
     ----------
     df : DataFrame with date column and value column
     value_col : Column to aggregate (enrolments or updates)
-    group_by : 'state' or 'district' level aggregation
+    group_by : 'state' or 'district' level aggregation, or a list of key columns
     
     Returns
     -------
     DataFrame with TAES scores
     """
-    df = df.copy()
-    
-    # Ensure date parsing
-    if not pd.api.types.is_datetime64_any_dtype(df['date']):
-        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-    
-    df['is_weekend'] = df['date'].dt.dayofweek >= 5
+    # Parse dates and derive the weekend flag on distinct dates only
+    dates = parse_dates(df['date']).rename('date')
+    if 'is_weekend' in df.columns:
+        is_weekend = df['is_weekend']
+    else:
+        is_weekend = calendar_feature(dates, 'is_weekend')
     
     # Calculate daily totals by group
-    daily = df.groupby([group_by, 'date', 'is_weekend'])[value_col].sum().reset_index()
+    keys = _group_keys(group_by)
+    daily = df[value_col].groupby(
+        [df[k] for k in keys] + [dates, is_weekend], observed=True
+    ).sum().reset_index()
     
     # Separate weekend and weekday averages
-    weekend_avg = daily[daily['is_weekend']].groupby(group_by)[value_col].mean().reset_index()
-    weekend_avg.columns = [group_by, 'weekend_avg']
+    weekend_avg = daily[daily['is_weekend']].groupby(keys, observed=True)[value_col].mean().reset_index()
+    weekend_avg = weekend_avg.rename(columns={value_col: 'weekend_avg'})
     
-    weekday_avg = daily[~daily['is_weekend']].groupby(group_by)[value_col].mean().reset_index()
-    weekday_avg.columns = [group_by, 'weekday_avg']
+    weekday_avg = daily[~daily['is_weekend']].groupby(keys, observed=True)[value_col].mean().reset_index()
+    weekday_avg = weekday_avg.rename(columns={value_col: 'weekday_avg'})
     
     # Merge and calculate TAES
     result = weekend_avg.merge(weekday_avg, on=group_by, how='outer')
@@ -202,11 +326,7 @@ def calculate_taes(
     result['taes'] = result['taes'].fillna(0).clip(upper=1.5)  # Cap at 1.5
     
     # Categorize
-    result['taes_status'] = pd.cut(
-        result['taes'],
-        bins=[-np.inf, 0.50, 0.70, 0.90, np.inf],
-        labels=['Severe Inequity', 'Moderate Inequity', 'Acceptable', 'Equitable']
-    )
+    result['taes_status'] = categorize_metric(result['taes'], 'taes')
     
     return result.sort_values('taes', ascending=True)
 
@@ -215,6 +335,36 @@ def calculate_taes(
 # METRIC 4: Update Completeness Ratio (UCR)
 # =============================================================================
 
+def _district_update_totals(
+    demographic_df: pd.DataFrame,
+    biometric_df: pd.DataFrame,
+    keys: list
+) -> pd.DataFrame:
+    """Total demographic + biometric updates per district, with the UCR group keys."""
+    dist_keys = list(dict.fromkeys(keys + ['state', 'district']))
+    
+    # Combine updates at district level
+    demo_dist = demographic_df.groupby(dist_keys, observed=True).agg({
+        'demo_age_5_17': 'sum',
+        'demo_age_17_': 'sum'
+    }).reset_index()
+    demo_dist['total_demo'] = demo_dist['demo_age_5_17'] + demo_dist['demo_age_17_']
+    
+    bio_dist = biometric_df.groupby(dist_keys, observed=True).agg({
+        'bio_age_5_17': 'sum',
+        'bio_age_17_': 'sum'
+    }).reset_index()
+    bio_dist['total_bio'] = bio_dist['bio_age_5_17'] + bio_dist['bio_age_17_']
+    
+    # Merge
+    dist_data = demo_dist.merge(bio_dist, on=dist_keys, how='outer')
+    dist_data = dist_data.fillna(0)
+    dist_data['total_updates'] = dist_data['total_demo'] + dist_data['total_bio']
+    return dist_data
+
+
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_ucr(
     demographic_df: pd.DataFrame,
     biometric_df: pd.DataFrame,
@@ -232,58 +382,107 @@ def calculate_ucr(
     ----------
     demographic_df : DataFrame with demographic updates
     biometric_df : DataFrame with biometric updates
-    group_by : 'state' level (counts districts within state)
+    group_by : 'state' level (counts districts within state), or any
+        coarser key column(s) such as region
     min_activity_threshold : Minimum updates to count as "active"
     
     Returns
     -------
     DataFrame with UCR scores
     """
-    # Combine updates at district level
-    demo_dist = demographic_df.groupby(['state', 'district']).agg({
-        'demo_age_5_17': 'sum',
-        'demo_age_17_': 'sum'
-    }).reset_index()
-    demo_dist['total_demo'] = demo_dist['demo_age_5_17'] + demo_dist['demo_age_17_']
-    
-    bio_dist = biometric_df.groupby(['state', 'district']).agg({
-        'bio_age_5_17': 'sum',
-        'bio_age_17_': 'sum'
-    }).reset_index()
-    bio_dist['total_bio'] = bio_dist['bio_age_5_17'] + bio_dist['bio_age_17_']
-    
-    # Merge
-    dist_data = demo_dist.merge(bio_dist, on=['state', 'district'], how='outer')
-    dist_data = dist_data.fillna(0)
-    dist_data['total_updates'] = dist_data['total_demo'] + dist_data['total_bio']
+    keys = _group_keys(group_by)
+    dist_data = _district_update_totals(demographic_df, biometric_df, keys)
     
     # Flag active districts
     dist_data['is_active'] = dist_data['total_updates'] >= min_activity_threshold
     
     # Aggregate to state level
-    result = dist_data.groupby('state').agg({
+    result = dist_data.groupby(keys, observed=True).agg({
         'district': 'count',
         'is_active': 'sum'
     }).reset_index()
-    result.columns = ['state', 'total_districts', 'active_districts']
+    result.columns = keys + ['total_districts', 'active_districts']
     
     # Calculate UCR
     result['ucr'] = result['active_districts'] / result['total_districts']
     
     # Categorize
-    result['ucr_status'] = pd.cut(
-        result['ucr'],
-        bins=[-np.inf, 0.50, 0.75, 0.90, np.inf],
-        labels=['Poor Coverage', 'Partial', 'Good', 'Excellent']
-    )
+    result['ucr_status'] = categorize_metric(result['ucr'], 'ucr')
     
     return result.sort_values('ucr', ascending=True)
 
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
+def calculate_ucr_sweep(
+    demographic_df: pd.DataFrame,
+    biometric_df: pd.DataFrame,
+    thresholds,
+    group_by: str = 'state'
+) -> pd.DataFrame:
+    """
+    UCR for many activity thresholds in one pass.
+    
+    District totals are computed once. Each total is located among the
+    sorted thresholds with searchsorted (the number of thresholds it
+    meets), counted per group with bincount, and a reverse cumulative sum
+    over the threshold axis turns those counts into the number of active
+    districts at every threshold. 1,000 thresholds cost about as much as
+    one calculate_ucr call.
+    
+    Parameters
+    ----------
+    demographic_df : DataFrame with demographic updates
+    biometric_df : DataFrame with biometric updates
+    thresholds : Minimum updates to count a district as "active", one per
+        column of the result (any order)
+    group_by : 'state' level, or any coarser key column(s) such as region
+    
+    Returns
+    -------
+    DataFrame of UCR values, one row per group (indexed by the group keys)
+    and one column per threshold, in the order given. Column-wise it
+    matches calculate_ucr(..., min_activity_threshold=t).
+    """
+    keys = _group_keys(group_by)
+    thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1)
+    dist_data = _district_update_totals(demographic_df, biometric_df, keys)
+    
+    groups = GroupCodes([dist_data], keys)
+    codes = groups.codes[0]
+    totals = dist_data['total_updates'].to_numpy(dtype=np.float64)
+    counted = (codes >= 0) & dist_data['district'].notna().to_numpy()
+    
+    # Number of sorted thresholds each district meets (total >= threshold)
+    order = np.argsort(thresholds, kind='stable')
+    met = np.searchsorted(thresholds[order], totals[counted], side='right')
+    
+    # met_hist[g, k] = districts of group g meeting exactly the k lowest
+    # thresholds; reverse cumsum gives those meeting threshold k-1 or more
+    n_thresholds = len(thresholds)
+    met_hist = np.bincount(
+        codes[counted] * (n_thresholds + 1) + met,
+        minlength=groups.n_groups * (n_thresholds + 1)
+    ).reshape(groups.n_groups, n_thresholds + 1)
+    active_sorted = np.cumsum(met_hist[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    
+    active = np.empty_like(active_sorted)
+    active[:, order] = active_sorted
+    total_districts = met_hist.sum(axis=1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ucr = active / total_districts[:, None]
+    
+    index = pd.MultiIndex.from_frame(groups.keys()) if len(keys) > 1 else pd.Index(groups.keys()[keys[0]])
+    return pd.DataFrame(ucr, index=index, columns=pd.Index(thresholds, name='min_activity_threshold'))
+
+
 # =============================================================================
 # METRIC 5: Age-Adjusted Update Propensity (AAUP)
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_aaup(
     demographic_df: pd.DataFrame,
     biometric_df: pd.DataFrame,
@@ -301,35 +500,37 @@ def calculate_aaup(
     ----------
     demographic_df : DataFrame with demographic updates
     biometric_df : DataFrame with biometric updates  
-    population_df : DataFrame with state population data
-    group_by : 'state' level aggregation
+    population_df : DataFrame with population data keyed by the group_by column(s)
+    group_by : 'state' level aggregation, or coarser key column(s)
     
     Returns
     -------
     DataFrame with AAUP scores
     """
+    keys = _group_keys(group_by)
+    
     # Aggregate updates by state
-    demo_agg = demographic_df.groupby('state').agg({
+    demo_agg = demographic_df.groupby(keys, observed=True).agg({
         'demo_age_5_17': 'sum',
         'demo_age_17_': 'sum'
     }).reset_index()
     demo_agg['demo_total'] = demo_agg['demo_age_5_17'] + demo_agg['demo_age_17_']
     
-    bio_agg = biometric_df.groupby('state').agg({
+    bio_agg = biometric_df.groupby(keys, observed=True).agg({
         'bio_age_5_17': 'sum',
         'bio_age_17_': 'sum'
     }).reset_index()
     bio_agg['bio_total'] = bio_agg['bio_age_5_17'] + bio_agg['bio_age_17_']
     
     # Merge updates
-    updates = demo_agg.merge(bio_agg, on='state', how='outer')
+    updates = demo_agg.merge(bio_agg, on=keys, how='outer')
     updates = updates.fillna(0)
     updates['total_updates'] = updates['demo_total'] + updates['bio_total']
     
     # Merge with population
     result = updates.merge(
-        population_df[['state', 'population_2024_est']], 
-        on='state', 
+        population_df[keys + ['population_2024_est']], 
+        on=keys, 
         how='left'
     )
     
@@ -345,11 +546,7 @@ def calculate_aaup(
     result['aaup'] = result['updates_per_10k'] / national_avg
     
     # Categorize
-    result['aaup_status'] = pd.cut(
-        result['aaup'],
-        bins=[-np.inf, 0.50, 0.80, 1.20, np.inf],
-        labels=['Severely Under', 'Under', 'Normal', 'Over']
-    )
+    result['aaup_status'] = categorize_metric(result['aaup'], 'aaup')
     
     return result.sort_values('aaup', ascending=True)
 
@@ -358,19 +555,44 @@ def calculate_aaup(
 # COMBINED METRICS DASHBOARD
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_all_metrics(
     enrolment_df: pd.DataFrame,
     demographic_df: pd.DataFrame,
     biometric_df: pd.DataFrame,
-    population_df: Optional[pd.DataFrame] = None
+    population_df: Optional[pd.DataFrame] = None,
+    weight_col: Optional[str] = None,
+    cubes: Optional[dict] = None
 ) -> pd.DataFrame:
     """
     Calculate all 5 metrics and return unified state-level dashboard.
     
+    Each dataset is scanned once into its aggregation cube (see
+    build_metric_cubes) and every metric is computed from the cubes.
+    
+    Parameters
+    ----------
+    weight_col : Sample weight column; when given, counts are scaled with
+        apply_sample_weights first so the metrics are full-data estimates
+    cubes : Prebuilt cubes from build_metric_cubes; the raw frames are
+        ignored when given
+    
     Returns
     -------
     DataFrame with all metric scores per state
     """
+    if cubes is None:
+        if weight_col is not None:
+            enrolment_df = apply_sample_weights(enrolment_df, weight_col)
+            demographic_df = apply_sample_weights(demographic_df, weight_col)
+            biometric_df = apply_sample_weights(biometric_df, weight_col)
+        cubes = build_metric_cubes(enrolment_df, demographic_df, biometric_df)
+    
+    enrolment_df = cubes['enrolment']
+    demographic_df = cubes['demographic']
+    biometric_df = cubes['biometric']
+    
     # Calculate each metric
     ifi = calculate_ifi(enrolment_df, demographic_df, biometric_df, 'state')
     clcr = calculate_clcr(enrolment_df, biometric_df, 'state')
@@ -399,10 +621,206 @@ def calculate_all_metrics(
     return result.sort_values('composite_score', ascending=True)
 
 
+# =============================================================================
+# INCREMENTAL METRICS
+# =============================================================================
+
+class IncrementalMetrics:
+    """
+    State-level dashboard metrics maintained from additive accumulators.
+    
+    Every core metric is a ratio of grouped sums (TAES: of daily sums and
+    day counts), so the state holds only those sums. update() folds in a
+    batch of new rows - e.g. one day of data - in time proportional to the
+    batch, and metrics() derives values and status categories from the
+    accumulators without touching earlier rows.
+    
+    Accumulators:
+    - per state: enrolment, update and child counts (IFI, CLCR, AAUP)
+    - per state and weekend flag: enrolment total and number of days (TAES)
+    - per (state, date): seen marker, so a batch extending a day already
+      counted does not add a second day
+    - per district: update totals (UCR)
+    
+    Example
+    -------
+    >>> state = IncrementalMetrics(population_df)
+    >>> state.update(enrolment_df, demographic_df, biometric_df)
+    >>> state.update(new_enrolment_rows)   # next day's delivery
+    >>> dashboard = state.metrics()
+    >>> state.save('data/processed/metric_state.pkl')
+    """
+    
+    def __init__(
+        self,
+        population_df: Optional[pd.DataFrame] = None,
+        min_activity_threshold: int = 100,
+        expected_annual_update_rate: float = 0.20
+    ):
+        self.population_df = population_df
+        self.min_activity_threshold = min_activity_threshold
+        self.expected_annual_update_rate = expected_annual_update_rate
+        
+        self.enrolment = pd.DataFrame(columns=['total_enrolments', 'age_5_17'], dtype=np.float64)
+        self.demographic = pd.DataFrame(columns=['total_demo_updates'], dtype=np.float64)
+        self.biometric = pd.DataFrame(columns=['total_bio_updates', 'bio_age_5_17'], dtype=np.float64)
+        self.daily = pd.DataFrame(
+            columns=['weekend_total', 'weekend_days', 'weekday_total', 'weekday_days'],
+            dtype=np.float64
+        )
+        self.districts = pd.DataFrame(columns=['total_demo', 'total_bio'], dtype=np.float64)
+        self.seen_days = set()
+    
+    @staticmethod
+    def _fold(accumulator: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+        """Add grouped sums to an accumulator, appending new groups."""
+        delta = delta.astype(np.float64)
+        if accumulator.empty:
+            return delta
+        return accumulator.add(delta, fill_value=0)
+    
+    @staticmethod
+    def _state_sums(cube: pd.DataFrame, columns: list, keys=('state',)) -> pd.DataFrame:
+        """Sum cube columns by keys with plain (non-categorical) group labels."""
+        sums = cube.groupby(list(keys), observed=True)[columns].sum()
+        if isinstance(sums.index, pd.MultiIndex):
+            sums.index = pd.MultiIndex.from_tuples(list(sums.index), names=sums.index.names)
+        else:
+            sums.index = pd.Index(sums.index.astype(object), name=sums.index.name)
+        return sums
+    
+    def update(
+        self,
+        enrolment_df: Optional[pd.DataFrame] = None,
+        demographic_df: Optional[pd.DataFrame] = None,
+        biometric_df: Optional[pd.DataFrame] = None
+    ) -> 'IncrementalMetrics':
+        """
+        Fold a batch of new rows of any of the datasets into the accumulators.
+        
+        Returns
+        -------
+        self, so calls can be chained
+        """
+        if enrolment_df is not None and len(enrolment_df):
+            cube = build_metric_cube(enrolment_df, 'enrolment')
+            self.enrolment = self._fold(
+                self.enrolment, self._state_sums(cube, ['total_enrolments', 'age_5_17'])
+            )
+            self._update_daily(cube)
+        
+        if demographic_df is not None and len(demographic_df):
+            cube = build_metric_cube(demographic_df, 'demographic')
+            self.demographic = self._fold(
+                self.demographic, self._state_sums(cube, ['total_demo_updates'])
+            )
+            dist = self._state_sums(cube, ['total_demo_updates'], ('state', 'district'))
+            self.districts = self._fold(self.districts, dist.set_axis(['total_demo'], axis=1))
+        
+        if biometric_df is not None and len(biometric_df):
+            cube = build_metric_cube(biometric_df, 'biometric')
+            self.biometric = self._fold(
+                self.biometric, self._state_sums(cube, ['total_bio_updates', 'bio_age_5_17'])
+            )
+            dist = self._state_sums(cube, ['total_bio_updates'], ('state', 'district'))
+            self.districts = self._fold(self.districts, dist.set_axis(['total_bio'], axis=1))
+        
+        return self
+    
+    def _update_daily(self, cube: pd.DataFrame):
+        """Fold daily enrolment totals into the weekend / weekday TAES sums."""
+        days = self._state_sums(cube, ['total_enrolments'], ('state', 'date', 'is_weekend'))
+        days = days.reset_index()
+        
+        new_day = [(state, date) not in self.seen_days for state, date in zip(days['state'], days['date'])]
+        self.seen_days.update(zip(days['state'], days['date']))
+        
+        weekend = days['is_weekend'].to_numpy(dtype=bool)
+        total = days['total_enrolments'].to_numpy(dtype=np.float64)
+        delta = pd.DataFrame({
+            'state': days['state'],
+            'weekend_total': np.where(weekend, total, 0.0),
+            'weekend_days': (weekend & new_day).astype(np.float64),
+            'weekday_total': np.where(weekend, 0.0, total),
+            'weekday_days': (~weekend & new_day).astype(np.float64),
+        }).groupby('state').sum()
+        self.daily = self._fold(self.daily, delta)
+    
+    def metrics(self) -> pd.DataFrame:
+        """
+        Current state-level dashboard, as calculate_all_metrics would return it.
+        
+        Returns
+        -------
+        DataFrame with all metric scores per state
+        """
+        # IFI and CLCR are defined for states with enrolments
+        result = self.enrolment.rename(columns={'age_5_17': 'child_enrolments'})
+        result = result.join(self.demographic).join(self.biometric).fillna(0)
+        result['total_updates'] = result['total_demo_updates'] + result['total_bio_updates']
+        result['ifi'] = (result['total_updates'] / result['total_enrolments'].replace(0, np.nan)).fillna(0)
+        expected = result['child_enrolments'] * self.expected_annual_update_rate
+        result['clcr'] = (result['bio_age_5_17'] / expected.replace(0, np.nan)).fillna(0)
+        
+        # TAES: ratio of mean weekend to mean weekday daily totals
+        daily = self.daily
+        weekend_avg = (daily['weekend_total'] / daily['weekend_days'].replace(0, np.nan)).fillna(0)
+        weekday_avg = (daily['weekday_total'] / daily['weekday_days'].replace(0, np.nan)).fillna(0)
+        taes = (weekend_avg / weekday_avg.replace(0, np.nan)).fillna(0).clip(upper=1.5)
+        result['taes'] = taes
+        
+        # UCR: share of districts with at least the threshold of updates
+        dist_total = self.districts.fillna(0).sum(axis=1)
+        active = (dist_total >= self.min_activity_threshold).groupby(level='state').agg(['count', 'sum'])
+        result['ucr'] = active['sum'] / active['count']
+        
+        result = result.rename_axis('state').reset_index()
+        for metric in ['ifi', 'clcr', 'taes', 'ucr']:
+            result[METRIC_BANDS[metric][0]] = categorize_metric(result[metric], metric)
+        
+        columns = ['state', 'ifi', 'ifi_risk', 'total_enrolments', 'total_updates',
+                   'clcr', 'clcr_status', 'taes', 'taes_status', 'ucr', 'ucr_status']
+        
+        # AAUP: per-capita updates relative to the mean over states with updates
+        if self.population_df is not None:
+            updates = self.demographic[['total_demo_updates']].join(
+                self.biometric[['total_bio_updates']], how='outer'
+            ).fillna(0).sum(axis=1)
+            population = self.population_df.set_index('state')['population_2024_est']
+            per_10k = updates / population.reindex(updates.index) * 10000
+            aaup = per_10k / per_10k.mean()
+            result['aaup'] = result['state'].map(aaup)
+            result['aaup_status'] = categorize_metric(result['aaup'], 'aaup')
+            columns += ['aaup', 'aaup_status']
+        
+        result = result[columns]
+        result['composite_score'] = (
+            result['ifi'].clip(upper=1) * 0.30 +
+            result['clcr'].clip(upper=1) * 0.25 +
+            result['taes'].clip(upper=1) * 0.20 +
+            result['ucr'] * 0.25
+        )
+        
+        return result.sort_values('composite_score', ascending=True)
+    
+    def save(self, path: str):
+        """Persist the accumulators (and settings) to a pickle file."""
+        pd.to_pickle(self.__dict__, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalMetrics':
+        """Restore a state saved with save()."""
+        state = cls.__new__(cls)
+        state.__dict__.update(pd.read_pickle(path))
+        return state
+
+
 # =============================================================================
 # LIFECYCLE GAP ANALYSIS (Trivariate)
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_lifecycle_gap(
     enrolment_df: pd.DataFrame,
     biometric_df: pd.DataFrame
@@ -416,29 +834,30 @@ def calculate_lifecycle_gap(
     -------
     DataFrame with lifecycle gap scores
     """
+    groups = GroupCodes([enrolment_df, biometric_df], 'state')
+    
+    # States present in both datasets (inner join)
+    both = groups.present(0) & groups.present(1)
+    result = groups.keys()[both].reset_index(drop=True)
+    
     # Child share of enrolments
-    enrol_agg = enrolment_df.groupby('state').agg({
-        'age_5_17': 'sum',
-        'age_18_greater': 'sum'
-    }).reset_index()
-    enrol_agg['child_share'] = (
-        enrol_agg['age_5_17'] / 
-        (enrol_agg['age_5_17'] + enrol_agg['age_18_greater'])
+    enrol = groups.sum(0, ['age_5_17', 'age_18_greater'])[both]
+    result['age_5_17'] = enrol[:, 0]
+    result['age_18_greater'] = enrol[:, 1]
+    result['child_share'] = (
+        result['age_5_17'] / 
+        (result['age_5_17'] + result['age_18_greater'])
     )
     
     # Child bio update rate
-    bio_agg = biometric_df.groupby('state').agg({
-        'bio_age_5_17': 'sum',
-        'bio_age_17_': 'sum'
-    }).reset_index()
-    bio_agg['child_bio_share'] = (
-        bio_agg['bio_age_5_17'] / 
-        (bio_agg['bio_age_5_17'] + bio_agg['bio_age_17_'])
+    bio = groups.sum(1, ['bio_age_5_17', 'bio_age_17_'])[both]
+    result['bio_age_5_17'] = bio[:, 0]
+    result['bio_age_17_'] = bio[:, 1]
+    result['child_bio_share'] = (
+        result['bio_age_5_17'] / 
+        (result['bio_age_5_17'] + result['bio_age_17_'])
     )
     
-    # Merge
-    result = enrol_agg.merge(bio_agg, on='state')
-    
     # Calculate lifecycle gap
     # Positive = high enrolment but low update (gap exists)
     result['lifecycle_gap'] = result['child_share'] - result['child_bio_share']
@@ -511,13 +930,111 @@ def calculate_risk_prediction_score(
     return round(rps, 4)
 
 
-def calculate_rps_dataframe(metrics_df: pd.DataFrame) -> pd.DataFrame:
+RPS_COMPONENTS = ('ifi', 'clcr', 'taes')
+DEFAULT_RPS_WEIGHTS = {'ifi': 0.5, 'clcr': 0.3, 'taes': 0.2}
+
+
+def rps_weight_matrix(weights=None) -> np.ndarray:
+    """
+    Normalise RPS weights to a (k, 3) array ordered as RPS_COMPONENTS.
+    
+    Accepts a dict, a sequence of dicts, a length-3 vector or a (k, 3)
+    array. Defaults to ``analysis.rps_weights`` from config.yaml.
+    """
+    if weights is None:
+        weights = load_config().get('analysis', {}).get('rps_weights', DEFAULT_RPS_WEIGHTS)
+    if isinstance(weights, dict):
+        weights = [weights]
+    if len(weights) and isinstance(weights[0], dict):
+        weights = [[w[c] for c in RPS_COMPONENTS] for w in weights]
+    
+    matrix = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if matrix.ndim != 2 or matrix.shape[1] != len(RPS_COMPONENTS):
+        raise ValueError(f"RPS weights must have shape (k, 3), got {matrix.shape}")
+    return matrix
+
+
+def _round_like_python(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Round like Python's round(x, decimals), elementwise.
+    
+    np.round scales by 10**decimals first, which can flip values sitting on
+    a rounding boundary; those few elements are re-rounded with round().
+    """
+    scale = 10.0 ** decimals
+    scaled = values * scale
+    rounded = np.round(scaled) / scale
+    
+    frac = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.flatnonzero(frac < 1e-6)
+    if ambiguous.size:
+        flat = rounded.reshape(-1)
+        flat[ambiguous] = [round(float(v), decimals) for v in values.reshape(-1)[ambiguous]]
+    return rounded
+
+
+def calculate_rps_vectorized(
+    ifi: Union[pd.Series, np.ndarray, float],
+    clcr: Union[pd.Series, np.ndarray, float],
+    taes: Union[pd.Series, np.ndarray, float],
+    weights=None,
+    ifi_percent: bool = False
+) -> np.ndarray:
+    """
+    Vectorized Risk Prediction Score over whole columns.
+    
+    Element for element identical to calculate_risk_prediction_score,
+    including the [0, 1] clipping and round(rps, 4).
+    
+    Parameters
+    ----------
+    ifi, clcr, taes : Metric values (scalars, arrays or Series)
+    weights : dict, length-3 vector, or (k, 3) array / list of dicts to
+        score k weightings in one call. Default: config.yaml rps_weights
+    ifi_percent : Treat IFI values above 1 as percentages (divide by 100),
+        as calculate_rps_dataframe does
+    
+    Returns
+    -------
+    ndarray shaped like the inputs for a single weighting, with a leading
+    axis of length k for several
+    """
+    ifi = np.asarray(ifi, dtype=np.float64)
+    clcr = np.asarray(clcr, dtype=np.float64)
+    taes = np.asarray(taes, dtype=np.float64)
+    
+    if ifi_percent:
+        ifi = np.where(ifi <= 1, ifi, ifi / 100)
+    
+    # Risk is the inverse of health on each clipped component
+    gaps = [1 - np.clip(ifi, 0, 1), 1 - np.clip(clcr, 0, 1), 1 - np.clip(taes, 0, 1)]
+    
+    single = (weights is None or isinstance(weights, dict)
+              or (not isinstance(weights[0], dict) and np.ndim(weights) == 1))
+    matrix = rps_weight_matrix(weights)
+    shape = np.broadcast_shapes(ifi.shape, clcr.shape, taes.shape)
+    w = matrix.reshape(matrix.shape + (1,) * len(shape))
+    
+    # Summed term by term in the scalar function's order so floats match
+    rps = w[:, 0] * gaps[0] + w[:, 1] * gaps[1] + w[:, 2] * gaps[2]
+    rps = _round_like_python(rps, 4)
+    
+    return rps[0] if single else rps
+
+
+@profiled(category='metric')
+@METRIC_CACHE.memoize
+def calculate_rps_dataframe(
+    metrics_df: pd.DataFrame,
+    weights: Optional[dict] = None
+) -> pd.DataFrame:
     """
     Calculate Risk Prediction Score for all states in metrics DataFrame.
     
     Parameters
     ----------
     metrics_df : DataFrame with 'ifi', 'clcr', 'taes' columns
+    weights : RPS weights; defaults to config.yaml rps_weights
     
     Returns
     -------
@@ -525,13 +1042,10 @@ def calculate_rps_dataframe(metrics_df: pd.DataFrame) -> pd.DataFrame:
     """
     result = metrics_df.copy()
     
-    result['rps'] = result.apply(
-        lambda row: calculate_risk_prediction_score(
-            row['ifi'] if row['ifi'] <= 1 else row['ifi'] / 100,  # Handle percentage format
-            row['clcr'],
-            row['taes']
-        ),
-        axis=1
+    # IFI may be stored as a percentage; values above 1 are rescaled
+    result['rps'] = calculate_rps_vectorized(
+        result['ifi'], result['clcr'], result['taes'],
+        weights=weights, ifi_percent=True
     )
     
     # Categorize risk levels
@@ -553,6 +1067,8 @@ def calculate_rps_dataframe(metrics_df: pd.DataFrame) -> pd.DataFrame:
 # METRIC 7: Equity Gap Score (EGS) - NEW
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_equity_gap(
     metrics_df: pd.DataFrame,
     group_col: str = 'region',
@@ -573,7 +1089,7 @@ def calculate_equity_gap(
     -------
     DataFrame with equity gap scores per group
     """
-    result = metrics_df.groupby(group_col).agg({
+    result = metrics_df.groupby(group_col, observed=True).agg({
         metric_col: ['min', 'max', 'mean', 'std', 'count']
     }).reset_index()
     
@@ -598,6 +1114,8 @@ def calculate_equity_gap(
     return result.sort_values('equity_gap', ascending=False)
 
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_district_equity_within_state(
     district_df: pd.DataFrame,
     metric_col: str = 'ifi'
@@ -651,47 +1169,80 @@ def calculate_confidence_interval(
     return (mean, mean - margin, mean + margin)
 
 
+def _critical_values(n: np.ndarray, confidence: float = 0.95) -> np.ndarray:
+    """
+    Two-sided critical values for sample sizes n, as calculate_confidence_interval picks them.
+    
+    Student t with n-1 degrees of freedom below 30 observations, normal
+    otherwise. The t quantile is evaluated once per distinct small n.
+    """
+    from scipy import stats
+    
+    q = (1 + confidence) / 2
+    crit = np.full(n.shape, stats.norm.ppf(q), dtype=np.float64)
+    
+    small = (n >= 2) & (n < 30)
+    if small.any():
+        sizes, inverse = np.unique(n[small], return_inverse=True)
+        crit[small] = stats.t.ppf(q, sizes - 1)[inverse]
+    return crit
+
+
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def add_confidence_to_metrics(
     df: pd.DataFrame,
     metric_cols: list,
-    group_by: str = 'state'
+    group_by: str = 'state',
+    confidence: float = 0.95
 ) -> pd.DataFrame:
     """
     Add confidence intervals to aggregated metrics.
     
+    Same intervals as calculate_confidence_interval applied per group, but
+    computed from a single groupby aggregation with the critical values
+    evaluated for all group sizes at once.
+    
     Parameters
     ----------
     df : Raw data DataFrame
     metric_cols : List of metric columns to calculate CI for
     group_by : Grouping column
+    confidence : Confidence level (default 0.95 for 95% CI)
     
     Returns
     -------
     DataFrame with _ci_lower and _ci_upper columns for each metric
     """
-    try:
-        from scipy import stats
-        
-        result_data = []
-        
-        for group_name, group_df in df.groupby(group_by):
-            row = {group_by: group_name}
-            
-            for col in metric_cols:
-                if col in group_df.columns:
-                    mean, lower, upper = calculate_confidence_interval(group_df[col])
-                    row[col] = mean
-                    row[f'{col}_ci_lower'] = lower
-                    row[f'{col}_ci_upper'] = upper
-                    row[f'{col}_sample_size'] = len(group_df)
-            
-            result_data.append(row)
-        
-        return pd.DataFrame(result_data)
+    cols = [col for col in metric_cols if col in df.columns]
     
+    try:
+        import scipy  # noqa: F401
     except ImportError:
         # Fallback without scipy
-        return df.groupby(group_by)[metric_cols].agg(['mean', 'std', 'count']).reset_index()
+        return df.groupby(group_by, observed=True)[metric_cols].agg(['mean', 'std', 'count']).reset_index()
+    
+    grouped = df.groupby(group_by, observed=True)
+    n = grouped.size()
+    agg = grouped[cols].agg(['mean', 'std'])
+    
+    sizes = n.to_numpy()
+    crit = _critical_values(sizes, confidence)
+    root_n = np.sqrt(sizes)
+    
+    result = pd.DataFrame({group_by: n.index})
+    for col in cols:
+        mean = agg[(col, 'mean')].to_numpy()
+        std_err = agg[(col, 'std')].to_numpy() / root_n
+        # Groups with a single row get a zero-width interval
+        margin = np.where(sizes < 2, 0.0, crit * std_err)
+        
+        result[col] = mean
+        result[f'{col}_ci_lower'] = mean - margin
+        result[f'{col}_ci_upper'] = mean + margin
+        result[f'{col}_sample_size'] = sizes
+    
+    return result
 
 
 def flag_low_confidence_estimates(
@@ -724,6 +1275,8 @@ def flag_low_confidence_estimates(
 # PRIORITY RANKING - NEW
 # =============================================================================
 
+@profiled(category='metric')
+@METRIC_CACHE.memoize
 def calculate_intervention_priority(
     metrics_df: pd.DataFrame,
     population_col: str = None
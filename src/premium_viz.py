@@ -15,6 +15,8 @@ from typing import Optional, List, Tuple, Dict
 import warnings
 warnings.filterwarnings('ignore')
 
+from .utils import profiled
+
 # =============================================================================
 # PREMIUM COLOR SYSTEM
 # =============================================================================
@@ -151,6 +153,7 @@ def create_gradient_fill(ax, x, y, color1, color2, alpha=0.3):
 # PREMIUM CHART FUNCTIONS
 # =============================================================================
 
+@profiled(category='chart')
 def plot_ifi_rankings_premium(df: pd.DataFrame, 
                                ifi_col: str = 'ifi_score',
                                state_col: str = 'state',
@@ -230,6 +233,7 @@ def plot_ifi_rankings_premium(df: pd.DataFrame,
     return fig, ax
 
 
+@profiled(category='chart')
 def plot_metrics_heatmap_premium(df: pd.DataFrame,
                                   metrics: List[str] = ['ifi', 'clcr', 'taes', 'composite'],
                                   state_col: str = 'state',
@@ -294,6 +298,7 @@ def plot_metrics_heatmap_premium(df: pd.DataFrame,
     return fig, ax
 
 
+@profiled(category='chart')
 def create_hero_dashboard(metrics_summary: Dict,
                           title: str = "UIDAI Identity Lifecycle Health Dashboard",
                           figsize: Tuple = (16, 10),
@@ -461,6 +466,7 @@ def create_hero_dashboard(metrics_summary: Dict,
     return fig
 
 
+@profiled(category='chart')
 def plot_district_priority_premium(df: pd.DataFrame,
                                     district_col: str = 'district',
                                     state_col: str = 'state',
@@ -517,6 +523,7 @@ def plot_district_priority_premium(df: pd.DataFrame,
     return fig, ax
 
 
+@profiled(category='chart')
 def plot_trivariate_lifecycle(df: pd.DataFrame,
                                x_col: str = 'child_share',
                                y_col: str = 'child_bio_rate',
@@ -584,6 +591,7 @@ def plot_trivariate_lifecycle(df: pd.DataFrame,
 # EXPORT FUNCTION
 # =============================================================================
 
+@profiled(category='chart')
 def generate_all_premium_charts(metrics_df: pd.DataFrame, 
                                  output_dir: str = 'visualizations',
                                  prefix: str = 'premium_'):
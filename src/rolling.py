@@ -0,0 +1,224 @@
+"""
+Rolling-Window Metric Time Series
+=================================
+7-day IFI, weekly TAES and 28-day CLCR (or any window, or expanding) per
+state or district.
+
+The daily sums behind each metric are laid out as a dense
+(group × date × component) array and accumulated once along the date
+axis. Every window sum is then the difference of two cumulative sums,
+so each window costs O(1) per group regardless of its length.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Optional, Dict, List, Tuple
+import warnings
+warnings.filterwarnings('ignore')
+
+from .metrics import build_metric_cubes
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Default window length in days of each metric
+DEFAULT_WINDOWS = {'ifi': 7, 'taes': 7, 'clcr': 28}
+
+# Grouping keys of the supported levels (districts are qualified by state,
+# since district names repeat across states)
+LEVEL_KEYS = {
+    'state': ['state'],
+    'district': ['state', 'district'],
+}
+
+# Daily components accumulated for the metrics
+COMPONENTS = [
+    'total_enrolments', 'age_5_17', 'total_demo_updates', 'total_bio_updates', 'bio_age_5_17',
+    'weekend_total', 'weekday_total', 'weekend_days', 'weekday_days',
+]
+
+
+# =============================================================================
+# DENSE DAILY ARRAY
+# =============================================================================
+
+def dense_daily_array(
+    cubes: Dict[str, pd.DataFrame],
+    keys: List[str]
+) -> Tuple[pd.DataFrame, pd.DatetimeIndex, np.ndarray]:
+    """
+    Lay out daily component sums as a dense (group, date, component) array.
+
+    Dates span the full calendar range of the data, so days without
+    activity are zeros. Rows with missing dates are left out.
+
+    Parameters
+    ----------
+    cubes : Aggregation cubes from build_metric_cubes
+    keys : Grouping columns
+
+    Returns
+    -------
+    Tuple of (groups DataFrame of key values, dates, array with COMPONENTS
+    on the last axis)
+    """
+    frames = {name: cube.dropna(subset=['date']) for name, cube in cubes.items()}
+    all_keys = pd.concat([f[keys] for f in frames.values()], ignore_index=True)
+    groups = all_keys.drop_duplicates().dropna().sort_values(keys).reset_index(drop=True)
+    group_index = pd.MultiIndex.from_frame(groups)
+
+    start = min(f['date'].min() for f in frames.values())
+    end = max(f['date'].max() for f in frames.values())
+    dates = pd.date_range(start, end, freq='D')
+
+    n_groups, n_dates = len(groups), len(dates)
+    dense = np.zeros((n_groups, n_dates, len(COMPONENTS)))
+
+    def accumulate(frame: pd.DataFrame, columns: Dict[str, np.ndarray]):
+        group_codes = group_index.get_indexer(pd.MultiIndex.from_frame(frame[keys]))
+        date_codes = (frame['date'] - start).dt.days.to_numpy()
+        valid = group_codes >= 0
+        flat = group_codes[valid] * n_dates + date_codes[valid]
+        for component, values in columns.items():
+            dense[..., COMPONENTS.index(component)] += np.bincount(
+                flat, weights=np.asarray(values, dtype=np.float64)[valid],
+                minlength=n_groups * n_dates
+            ).reshape(n_groups, n_dates)
+
+    enrol = frames['enrolment']
+    weekend = enrol['is_weekend'].to_numpy(dtype=bool)
+    total = enrol['total_enrolments'].to_numpy(dtype=np.float64)
+    accumulate(enrol, {
+        'total_enrolments': total,
+        'age_5_17': enrol['age_5_17'],
+        'weekend_total': np.where(weekend, total, 0.0),
+        'weekday_total': np.where(weekend, 0.0, total),
+    })
+    accumulate(frames['demographic'], {'total_demo_updates': frames['demographic']['total_demo_updates']})
+    accumulate(frames['biometric'], {
+        'total_bio_updates': frames['biometric']['total_bio_updates'],
+        'bio_age_5_17': frames['biometric']['bio_age_5_17'],
+    })
+
+    # A day counts towards TAES when the group has enrolment rows on it
+    present = enrol[keys + ['date', 'is_weekend']].drop_duplicates()
+    present_weekend = present['is_weekend'].to_numpy(dtype=bool)
+    accumulate(present, {
+        'weekend_days': present_weekend.astype(np.float64),
+        'weekday_days': (~present_weekend).astype(np.float64),
+    })
+
+    return groups, dates, dense
+
+
+def window_sums(cumulative: np.ndarray, window: Optional[int]) -> np.ndarray:
+    """
+    Trailing window sums from a cumulative sum along axis 1.
+
+    cumulative has a leading zero column (length n_dates + 1). Windows not
+    yet covering ``window`` days are NaN, as in pandas rolling; window=None
+    gives expanding sums.
+    """
+    if window is None:
+        return cumulative[:, 1:]
+
+    n_dates = cumulative.shape[1] - 1
+    sums = np.full(cumulative[:, 1:].shape, np.nan)
+    if window <= n_dates:
+        sums[:, window - 1:] = cumulative[:, window:] - cumulative[:, :n_dates - window + 1]
+    return sums
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den with 0 where den is 0, as the snapshot metrics fill it."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den == 0, 0.0, num / np.where(den == 0, 1, den))
+
+
+# =============================================================================
+# ROLLING METRICS
+# =============================================================================
+
+def rolling_metrics(
+    enrolment_df: Optional[pd.DataFrame] = None,
+    demographic_df: Optional[pd.DataFrame] = None,
+    biometric_df: Optional[pd.DataFrame] = None,
+    group_by: str = 'state',
+    windows: Optional[Dict[str, int]] = None,
+    expanding: bool = False,
+    expected_annual_update_rate: float = 0.20,
+    cubes: Optional[dict] = None
+) -> pd.DataFrame:
+    """
+    Rolling (or expanding) IFI, TAES and CLCR per group and day.
+
+    Within a window the metrics follow the snapshot definitions: IFI =
+    updates / enrolments, CLCR = child bio updates / (child enrolments ×
+    expected rate), TAES = mean weekend daily total / mean weekday daily
+    total (capped at 1.5), each with 0 where the denominator is 0.
+
+    Parameters
+    ----------
+    enrolment_df, demographic_df, biometric_df : Raw or preprocessed frames
+    group_by : 'state' or 'district'
+    windows : Window length in days per metric (default DEFAULT_WINDOWS);
+        metrics left out are not computed
+    expanding : Compute expanding (since first date) instead of rolling
+        windows
+    expected_annual_update_rate : CLCR target rate
+    cubes : Prebuilt cubes from build_metric_cubes (frames ignored)
+
+    Returns
+    -------
+    Long DataFrame with the group keys, date and one column per metric,
+    named e.g. 'ifi_7d' (or 'ifi_expanding')
+    """
+    if group_by not in LEVEL_KEYS:
+        raise ValueError(f"Unknown level: {group_by}. Choose from {list(LEVEL_KEYS)}")
+
+    if windows is None:
+        windows = DEFAULT_WINDOWS
+
+    if cubes is None:
+        cubes = build_metric_cubes(enrolment_df, demographic_df, biometric_df)
+
+    keys = LEVEL_KEYS[group_by]
+    groups, dates, dense = dense_daily_array(cubes, keys)
+
+    # One cumulative pass over the date axis serves every window
+    cumulative = np.concatenate(
+        [np.zeros((dense.shape[0], 1, dense.shape[2])), np.cumsum(dense, axis=1)], axis=1
+    )
+
+    result = groups.loc[groups.index.repeat(len(dates))].reset_index(drop=True)
+    result['date'] = np.tile(dates.to_numpy(), len(groups))
+
+    for metric, window in windows.items():
+        window = None if expanding else window
+        sums = {
+            component: window_sums(cumulative[..., i], window)
+            for i, component in enumerate(COMPONENTS)
+        }
+
+        if metric == 'ifi':
+            values = _ratio(sums['total_demo_updates'] + sums['total_bio_updates'],
+                            sums['total_enrolments'])
+        elif metric == 'clcr':
+            values = _ratio(sums['bio_age_5_17'], sums['age_5_17'] * expected_annual_update_rate)
+        elif metric == 'taes':
+            values = np.minimum(_ratio(
+                _ratio(sums['weekend_total'], sums['weekend_days']),
+                _ratio(sums['weekday_total'], sums['weekday_days'])
+            ), 1.5)
+        else:
+            raise ValueError(f"Unknown rolling metric: {metric}")
+
+        # Incomplete windows stay NaN through the ratios
+        values = np.where(np.isnan(sums['total_enrolments']), np.nan, values)
+
+        suffix = 'expanding' if window is None else f'{window}d'
+        result[f'{metric}_{suffix}'] = values.reshape(-1)
+
+    return result
@@ -0,0 +1,191 @@
+"""
+Hierarchical Rollup Engine
+==========================
+Metrics at every geographic level from a single scan of the raw data.
+
+Each dataset is aggregated once at the finest grain (pincode × date).
+District, state, region and national views are then derived by summing
+the next finer aggregate, so producing a metric at any level costs time
+proportional to the number of groups rather than the number of raw rows.
+
+Levels:
+    pincode → district → state → region → national
+"""
+
+import pandas as pd
+from typing import Optional, Dict, List
+import warnings
+warnings.filterwarnings('ignore')
+
+from .metrics import (
+    build_metric_cube,
+    calculate_ifi,
+    calculate_clcr,
+    calculate_taes,
+    calculate_ucr,
+    calculate_aaup,
+)
+from .utils import REGION_INDEX
+
+
+# =============================================================================
+# LEVEL DEFINITIONS
+# =============================================================================
+
+ROLLUP_LEVELS = ['pincode', 'district', 'state', 'region', 'national']
+
+# Key columns identifying a group at each level. Coarser keys are carried
+# along so every view can be filtered by region or state.
+LEVEL_KEYS = {
+    'pincode': ['region', 'state', 'district', 'pincode'],
+    'district': ['region', 'state', 'district'],
+    'state': ['region', 'state'],
+    'region': ['region'],
+    'national': ['national'],
+}
+
+NATIONAL_LABEL = 'India'
+
+# All non-count columns of a cube
+KEY_COLUMNS = ['national'] + LEVEL_KEYS['pincode'] + ['date', 'is_weekend']
+
+DATASETS = ('enrolment', 'demographic', 'biometric')
+
+# Metrics that need district-level detail (UCR) or population (AAUP) are
+# only defined from these levels upwards
+UCR_LEVELS = ['state', 'region', 'national']
+AAUP_LEVELS = ['state', 'region', 'national']
+
+
+def _with_region(df: pd.DataFrame, state_col: str = 'state') -> pd.DataFrame:
+    """Insert region and national columns through the shared region index."""
+    df.insert(0, 'region', REGION_INDEX.regions(df[state_col]))
+    df.insert(0, 'national', pd.Categorical([NATIONAL_LABEL] * len(df)))
+    return df
+
+
+# =============================================================================
+# ROLLUP ENGINE
+# =============================================================================
+
+class MetricRollup:
+    """
+    Multi-level aggregation cubes for the three datasets.
+
+    The pincode × date cubes are built on construction; coarser levels are
+    derived on first use and kept.
+
+    Example
+    -------
+    >>> rollup = MetricRollup(enrolment_df, demographic_df, biometric_df)
+    >>> district_metrics = rollup.metrics('district')
+    >>> region_ifi = calculate_ifi(*rollup.cubes('region').values(),
+    ...                            group_by=LEVEL_KEYS['region'])
+    """
+
+    def __init__(
+        self,
+        enrolment_df: pd.DataFrame,
+        demographic_df: pd.DataFrame,
+        biometric_df: pd.DataFrame
+    ):
+        frames = dict(zip(DATASETS, (enrolment_df, demographic_df, biometric_df)))
+        self._cubes = {
+            'pincode': {
+                name: _with_region(build_metric_cube(
+                    df, name, keys=('state', 'district', 'pincode')
+                ))
+                for name, df in frames.items()
+            }
+        }
+
+    def cubes(self, level: str = 'state') -> Dict[str, pd.DataFrame]:
+        """
+        Aggregation cubes of all datasets at a level.
+
+        Parameters
+        ----------
+        level : One of ROLLUP_LEVELS
+
+        Returns
+        -------
+        Dict of dataset name -> DataFrame keyed by the level's keys, date
+        and is_weekend
+        """
+        if level not in ROLLUP_LEVELS:
+            raise ValueError(f"Unknown level: {level}. Choose from {ROLLUP_LEVELS}")
+
+        if level not in self._cubes:
+            finer = self.cubes(ROLLUP_LEVELS[ROLLUP_LEVELS.index(level) - 1])
+            self._cubes[level] = {
+                name: self._rollup(cube, LEVEL_KEYS[level])
+                for name, cube in finer.items()
+            }
+        return self._cubes[level]
+
+    @staticmethod
+    def _rollup(cube: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """Sum a finer cube over every key not in keys, keeping date and the weekend flag."""
+        group_cols = list(dict.fromkeys(['national'] + keys)) + ['date', 'is_weekend']
+        value_cols = [c for c in cube.columns if c not in KEY_COLUMNS]
+        return cube.groupby(group_cols, observed=True, dropna=False, sort=False)[value_cols].sum().reset_index()
+
+    def population(self, population_df: pd.DataFrame, level: str = 'state') -> Optional[pd.DataFrame]:
+        """
+        Roll state population up to a level (None below state level).
+
+        Parameters
+        ----------
+        population_df : DataFrame with 'state' and 'population_2024_est'
+        level : One of ROLLUP_LEVELS
+        """
+        if level not in AAUP_LEVELS:
+            return None
+
+        pop = _with_region(population_df[['state', 'population_2024_est']].copy())
+        return pop.groupby(LEVEL_KEYS[level], observed=True)['population_2024_est'].sum().reset_index()
+
+    def metrics(
+        self,
+        level: str = 'state',
+        population_df: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate the core metrics at one level from the rolled-up cubes.
+
+        IFI, CLCR and TAES are available at every level. UCR (share of
+        active districts) and AAUP (population normalised) are added from
+        state level upwards, AAUP only when population data is given.
+
+        Parameters
+        ----------
+        level : One of ROLLUP_LEVELS
+        population_df : State population data for AAUP
+
+        Returns
+        -------
+        DataFrame with one row per group at the level
+        """
+        cubes = self.cubes(level)
+        keys = LEVEL_KEYS[level]
+        enrol, demo, bio = (cubes[name] for name in DATASETS)
+
+        ifi = calculate_ifi(enrol, demo, bio, group_by=keys)
+        clcr = calculate_clcr(enrol, bio, group_by=keys)
+        taes = calculate_taes(enrol, 'total_enrolments', group_by=keys)
+
+        result = ifi[keys + ['ifi', 'ifi_risk', 'total_enrolments', 'total_updates']]
+        result = result.merge(clcr[keys + ['clcr', 'clcr_status']], on=keys, how='left')
+        result = result.merge(taes[keys + ['taes', 'taes_status']], on=keys, how='left')
+
+        if level in UCR_LEVELS:
+            # UCR counts districts, so it is computed from district cubes
+            district = self.cubes('district')
+            ucr = calculate_ucr(district['demographic'], district['biometric'], group_by=keys)
+            result = result.merge(ucr[keys + ['ucr', 'ucr_status']], on=keys, how='left')
+
+        if population_df is not None and level in AAUP_LEVELS:
+            aaup = calculate_aaup(demo, bio, self.population(population_df, level), group_by=keys)
+            result = result.merge(aaup[keys + ['aaup', 'aaup_status']], on=keys, how='left')
+
+        return result.sort_values('ifi', ascending=True).reset_index(drop=True)
@@ -0,0 +1,273 @@
+"""
+RPS Weight Sensitivity
+======================
+How robust the intervention tiers are to the choice of metric weights.
+
+The RPS weights (0.5/0.3/0.2) and the composite weights in
+scripts/run_analysis.py (0.40/0.30/0.30) are judgement calls. This module
+scores every state or district under thousands of weight vectors, drawn
+from a simplex grid or a Dirichlet distribution, and reports how often
+each entity lands in each intervention tier of
+calculate_intervention_priority.
+
+All weightings of a batch are scored with one matrix product of the
+(weighting x metric) weights against the (metric x entity) risk gaps,
+rounded to 4 decimals as calculate_rps_vectorized rounds RPS.
+Ranks come from a histogram of the quantised priority scores rather than
+a sort, so a 100k-weighting district sweep runs in seconds.
+"""
+
+import pandas as pd
+import numpy as np
+from itertools import combinations
+from typing import Optional, Sequence
+import warnings
+warnings.filterwarnings('ignore')
+
+from .metrics import (
+    RPS_COMPONENTS, rps_weight_matrix, _round_like_python,
+    calculate_rps_dataframe, calculate_intervention_priority
+)
+from .utils import load_config
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Tier labels and their upper rank bounds, as in calculate_intervention_priority
+TIER_LABELS = ['Tier 1: Immediate', 'Tier 2: Short-term', 'Tier 3: Medium-term', 'Tier 4: Monitoring']
+TIER_RANK_BOUNDS = [5, 15, 30]
+
+
+# =============================================================================
+# WEIGHT GENERATORS
+# =============================================================================
+
+def simplex_grid(step: float = 0.05, n_metrics: int = len(RPS_COMPONENTS)) -> np.ndarray:
+    """
+    Every weight vector on a regular grid over the simplex.
+
+    Weights are multiples of ``step`` summing to 1 (stars and bars), e.g.
+    231 vectors for 3 metrics at step 0.05 and 5,151 at step 0.01.
+
+    Returns
+    -------
+    (k, n_metrics) array
+    """
+    n_steps = int(round(1 / step))
+    if not np.isclose(n_steps * step, 1):
+        raise ValueError(f"step must divide 1, got {step}")
+
+    # Bar positions among n_steps + n_metrics - 1 slots; gaps are the counts
+    slots = n_steps + n_metrics - 1
+    bars = np.array(list(combinations(range(slots), n_metrics - 1)), dtype=np.int64).reshape(-1, n_metrics - 1)
+    edges = np.hstack([
+        np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), slots)
+    ])
+    return (np.diff(edges, axis=1) - 1) / n_steps
+
+
+def dirichlet_weights(
+    n_samples: int,
+    alpha=1.0,
+    n_metrics: int = len(RPS_COMPONENTS),
+    random_seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Random weight vectors from a Dirichlet distribution.
+
+    alpha=1 samples the simplex uniformly. A vector alpha such as
+    ``200 * baseline_weights`` concentrates the samples around a baseline.
+
+    Returns
+    -------
+    (n_samples, n_metrics) array
+    """
+    if random_seed is None:
+        random_seed = load_config().get('random_seed', 42)
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (n_metrics,))
+    return np.random.default_rng(random_seed).dirichlet(alpha, size=n_samples)
+
+
+def _weight_matrix(weights, metrics: Sequence[str]) -> np.ndarray:
+    """Normalise weights (dict, list of dicts, vector or (k, m) array) to a (k, m) array."""
+    if tuple(metrics) == RPS_COMPONENTS:
+        return rps_weight_matrix(weights)
+    if isinstance(weights, dict):
+        weights = [weights]
+    if len(weights) and isinstance(weights[0], dict):
+        weights = [[w[m] for m in metrics] for w in weights]
+
+    matrix = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if matrix.ndim != 2 or matrix.shape[1] != len(metrics):
+        raise ValueError(f"Weights must have shape (k, {len(metrics)}), got {matrix.shape}")
+    return matrix
+
+
+def _score_matrix(weights: np.ndarray, gaps: np.ndarray) -> np.ndarray:
+    """
+    RPS of every (weighting, entity) pair: weights @ gaps, rounded to 4 decimals.
+    
+    The product is accumulated one metric at a time, in the order the
+    scalar RPS sums its terms, so values on a rounding boundary round the
+    same way as calculate_rps_vectorized (a BLAS matmul may differ in the
+    last bit and flip them).
+    """
+    scores = weights[:, [0]] * gaps[0]
+    for j in range(1, len(gaps)):
+        scores += weights[:, [j]] * gaps[j]
+    return _round_like_python(scores, 4)
+
+
+# =============================================================================
+# TIER ASSIGNMENT
+# =============================================================================
+
+def _priority_tiers(scores: np.ndarray) -> tuple:
+    """
+    Priority ranks and tier codes of a (k, n) batch of priority scores.
+
+    Follows calculate_intervention_priority row by row: scores are scaled
+    to 0-100 of the row maximum and rounded to 0.1, ranked descending with
+    ties sharing their average rank (truncated to int), and binned at
+    TIER_RANK_BOUNDS. Rounding to 0.1 makes the scores small integers, so
+    each row is ranked with a bincount histogram and a cumulative sum.
+
+    Returns
+    -------
+    Tuple of (int ranks, tier codes 0-3), both shaped like scores
+    """
+    k, n = scores.shape
+    row_max = scores.max(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        levels = np.where(row_max > 0, np.rint(scores / row_max * 100 * 10), 0).astype(np.int64)
+
+    # Shift levels to start at 0 so each row gets a compact histogram
+    levels -= levels.min()
+    n_levels = int(levels.max()) + 1
+    flat = levels + np.arange(k)[:, None] * n_levels
+    hist = np.bincount(flat.ravel(), minlength=k * n_levels).reshape(k, n_levels)
+
+    # Rank and tier of every level (entities scoring strictly higher plus
+    # the average position among ties), then looked up per entity
+    higher = np.cumsum(hist[:, ::-1], axis=1)[:, ::-1] - hist
+    level_ranks = (higher + (hist + 1) / 2).astype(np.int64)
+    level_tiers = np.searchsorted(TIER_RANK_BOUNDS, level_ranks, side='left')
+
+    ranks = level_ranks.ravel()[flat]
+    tiers = level_tiers.ravel()[flat]
+    return ranks, tiers
+
+
+# =============================================================================
+# SENSITIVITY SWEEP
+# =============================================================================
+
+def weight_sensitivity(
+    metrics_df: pd.DataFrame,
+    weights=None,
+    n_samples: int = 10000,
+    alpha=1.0,
+    metrics: Sequence[str] = RPS_COMPONENTS,
+    key_cols: Sequence[str] = ('state',),
+    population_col: Optional[str] = None,
+    baseline_weights=None,
+    random_seed: Optional[int] = None,
+    batch_size: int = 2000
+) -> pd.DataFrame:
+    """
+    Intervention tier frequencies of each entity across many weightings.
+
+    Each weighting scores entities as RPS = sum_j w_j * (1 - clip(metric_j,
+    0, 1)), then takes them through the priority pipeline of
+    calculate_intervention_priority (optionally times log10 population) to
+    a tier. The run_analysis composite sum_j w_j * min(metric_j, 1) is 1 -
+    RPS for weights summing to 1 and non-negative metrics, so its tiers
+    are covered by the same sweep. RPS is rounded to 4 decimals before
+    ranking, as in the pipeline, so ranks and tiers match it exactly.
+
+    Parameters
+    ----------
+    metrics_df : One row per entity with the metric columns; IFI above 1
+        is read as a percentage, as in calculate_rps_dataframe
+    weights : Weightings to evaluate - (k, m) array, list of dicts or a
+        simplex_grid(); None draws n_samples from Dirichlet(alpha)
+    n_samples : Number of Dirichlet weightings when weights is None
+    alpha : Dirichlet concentration (scalar or one value per metric)
+    metrics : Metric columns, in weight order (default ifi, clcr, taes)
+    key_cols : Entity key columns, e.g. ('state', 'district')
+    population_col : Population column for population-weighted priority
+    baseline_weights : Weights of the reported baseline tier; defaults to
+        config.yaml rps_weights (for the default metrics)
+    random_seed : Seed of the Dirichlet draws (default config.yaml)
+    batch_size : Weightings scored per matrix product
+
+    Returns
+    -------
+    DataFrame per entity with baseline_tier, p_tier_1 ... p_tier_4, modal
+    tier, mean_rank, best_rank and worst_rank, sorted by mean_rank
+    """
+    metrics = list(metrics)
+    key_cols = list(key_cols)
+
+    if weights is None:
+        weights = dirichlet_weights(n_samples, alpha, len(metrics), random_seed)
+    weight_matrix = _weight_matrix(weights, metrics)
+
+    values = metrics_df[metrics].to_numpy(dtype=np.float64, copy=True)
+    if np.isnan(values).any():
+        raise ValueError("Metric columns contain missing values; fill or drop them first")
+    if 'ifi' in metrics:
+        col = metrics.index('ifi')
+        values[:, col] = np.where(values[:, col] <= 1, values[:, col], values[:, col] / 100)
+
+    # Risk gaps as a (metric, entity) matrix; scores = weights @ gaps
+    gaps = (1 - np.clip(values, 0, 1)).T
+
+    scale = None
+    if population_col and population_col in metrics_df.columns:
+        scale = np.log10(metrics_df[population_col].replace(0, 1).to_numpy(dtype=np.float64))
+
+    n_weightings, n_entities = len(weight_matrix), len(metrics_df)
+    tier_counts = np.zeros((n_entities, len(TIER_LABELS)), dtype=np.int64)
+    rank_sum = np.zeros(n_entities)
+    best_rank = np.full(n_entities, np.iinfo(np.int64).max)
+    worst_rank = np.zeros(n_entities, dtype=np.int64)
+    entity = np.arange(n_entities)
+
+    for start in range(0, n_weightings, batch_size):
+        scores = _score_matrix(weight_matrix[start:start + batch_size], gaps)
+        if scale is not None:
+            scores = scores * scale
+
+        ranks, tiers = _priority_tiers(scores)
+        tier_counts += np.bincount(
+            (entity * len(TIER_LABELS) + tiers).ravel(),
+            minlength=n_entities * len(TIER_LABELS)
+        ).reshape(n_entities, len(TIER_LABELS))
+        rank_sum += ranks.sum(axis=0)
+        best_rank = np.minimum(best_rank, ranks.min(axis=0))
+        worst_rank = np.maximum(worst_rank, ranks.max(axis=0))
+
+    result = metrics_df[key_cols].reset_index(drop=True)
+
+    # Baseline tier from the production pipeline itself
+    baseline = None
+    if tuple(metrics) == RPS_COMPONENTS:
+        baseline = calculate_rps_dataframe(metrics_df.reset_index(drop=True), weights=baseline_weights)
+    elif baseline_weights is not None:
+        baseline = metrics_df.reset_index(drop=True)
+        baseline['rps'] = _score_matrix(_weight_matrix(baseline_weights, metrics), gaps)[0]
+    if baseline is not None:
+        baseline = calculate_intervention_priority(baseline, population_col).sort_index()
+        result['baseline_tier'] = baseline['intervention_tier'].to_numpy()
+
+    for i in range(len(TIER_LABELS)):
+        result[f'p_tier_{i + 1}'] = tier_counts[:, i] / n_weightings
+    result['modal_tier'] = pd.Categorical.from_codes(tier_counts.argmax(axis=1), categories=TIER_LABELS)
+    result['mean_rank'] = rank_sum / n_weightings
+    result['best_rank'] = best_rank
+    result['worst_rank'] = worst_rank
+
+    return result.sort_values('mean_rank').reset_index(drop=True)
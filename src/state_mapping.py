@@ -4,6 +4,18 @@ State Name Standardization for UIDAI Data
 Maps all variant state names to official standardized versions.
 """
 
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+from .utils import load_config, logger
+
 # Official state name mapping
 STATE_NAME_MAP = {
     # Andhra Pradesh variants
@@ -213,7 +225,62 @@ def standardize_state_name(state_name):
     return cleaned.title()
 
 
-def standardize_dataframe_states(df, column='state'):
+def _map_unique(values, func):
+    """
+    Apply func to each distinct value of a Series and return a categorical.
+    
+    Results are mapped back through the codes, merging values that map to
+    the same result; missing values stay missing.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    
+    mapped = pd.Index([func(v) for v in uniques], dtype=object)
+    return _recode(codes, mapped, values)
+
+
+def _recode(codes, mapped, values):
+    """Categorical Series from per-unique results ``mapped`` indexed by ``codes``."""
+    categories = mapped.dropna().unique()
+    try:
+        categories = categories.sort_values()
+    except TypeError:
+        # Non-string values are passed through and may not sort with names
+        pass
+    
+    # Trailing -1 entry keeps missing values missing
+    remap = np.append(categories.get_indexer(mapped), -1)
+    return pd.Series(
+        pd.Categorical.from_codes(remap[codes], categories=categories),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def standardize_state_series(values):
+    """
+    Standardize a column of state names as a categorical.
+    
+    standardize_state_name runs once per distinct raw value (or category)
+    rather than once per row; the results are mapped back through the
+    codes, merging variants that standardize to the same name.
+    
+    Parameters
+    ----------
+    values : pd.Series
+        Raw state names (object, string or categorical)
+        
+    Returns
+    -------
+    pd.Series
+        Categorical Series of standardized names, same index and name
+    """
+    return _map_unique(values, standardize_state_name)
+
+
+def standardize_dataframe_states(df, column='state', inplace=False):
     """
     Standardize all state names in a DataFrame.
     
@@ -223,12 +290,339 @@ def standardize_dataframe_states(df, column='state'):
         DataFrame with state column
     column : str
         Name of state column
+    inplace : bool
+        Replace the column on df itself instead of on a copy of the frame
         
     Returns
     -------
     pd.DataFrame
-        DataFrame with standardized state names
+        DataFrame with standardized state names as a categorical column
+        (df itself when inplace=True)
     """
-    df = df.copy()
-    df[column] = df[column].apply(standardize_state_name)
+    if not inplace:
+        df = df.copy()
+    df[column] = standardize_state_series(df[column])
     return df
+
+
+# =============================================================================
+# FUZZY NAME RESOLVER
+# =============================================================================
+
+DEFAULT_GAZETTEER_PATH = 'data/external/gazetteer.csv'
+DEFAULT_RESOLUTION_CACHE = 'data/processed/cache/name_resolution.json'
+
+# Character n-gram length of the index and the similarity a fuzzy match
+# must reach (difflib ratio on normalized names)
+NGRAM_SIZE = 3
+MIN_SIMILARITY = 0.85
+MAX_CANDIDATES = 5
+
+
+def normalize_name(name):
+    """
+    Comparison key of a place name.
+    
+    Lower case, '&' read as 'and', punctuation dropped and whitespace
+    collapsed, so 'Jammu & Kashmir' and 'JAMMU AND  KASHMIR' share a key.
+    """
+    key = str(name).lower().replace('&', ' and ')
+    key = re.sub(r'[^a-z0-9 ]', ' ', key)
+    return ' '.join(key.split())
+
+
+def _ngrams(key, n=NGRAM_SIZE):
+    """Character n-grams of a key, padded so word boundaries count."""
+    padded = f' {key} '
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class NgramIndex:
+    """
+    Inverted character n-gram index over canonical place names.
+    
+    Exact matches on the normalized key are a dict lookup. Other spellings
+    collect candidates through the n-gram postings, keep the few with the
+    highest Dice overlap and confirm them with an edit-distance ratio.
+    
+    Parameters
+    ----------
+    names : dict
+        Indexed spelling -> canonical name (aliases map to their canonical)
+    """
+    
+    def __init__(self, names):
+        self.exact = {}
+        for name, canonical in names.items():
+            self.exact.setdefault(normalize_name(name), canonical)
+        
+        self.keys = list(self.exact)
+        self.gram_counts = []
+        self.postings = defaultdict(list)
+        for i, key in enumerate(self.keys):
+            grams = _ngrams(key)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(i)
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def match(self, name, min_similarity=MIN_SIMILARITY):
+        """
+        Canonical name for a spelling and how it matched.
+        
+        Returns
+        -------
+        tuple
+            (canonical name or None, 'exact' / 'fuzzy' / None)
+        """
+        key = normalize_name(name)
+        if key in self.exact:
+            return self.exact[key], 'exact'
+        
+        grams = _ngrams(key)
+        shared = Counter(i for gram in grams for i in self.postings.get(gram, ()))
+        if not shared:
+            return None, None
+        
+        dice = {i: 2 * n / (len(grams) + self.gram_counts[i]) for i, n in shared.items()}
+        candidates = sorted(dice, key=dice.get, reverse=True)[:MAX_CANDIDATES]
+        best_score, best = max(
+            (SequenceMatcher(None, key, self.keys[i]).ratio(), self.keys[i]) for i in candidates
+        )
+        if best_score >= min_similarity:
+            return self.exact[best], 'fuzzy'
+        return None, None
+
+
+def _file_fingerprint(path):
+    """sha1 of a file's bytes, or None when it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+class NameResolver:
+    """
+    Resolve raw state and district spellings to a canonical gazetteer.
+    
+    The gazetteer is a CSV with 'state' and 'district' columns holding the
+    canonical names (see build_gazetteer), plus an optional 'alias' column
+    for renamed districts (e.g. Mysore for Mysuru). States are also matched against
+    the variants in STATE_NAME_MAP; districts are matched within their
+    resolved state. Spellings with no confident match fall back to the
+    existing cleaning (standardize_state_name, or strip + title case).
+    
+    Every distinct raw string is resolved once and remembered in a JSON
+    cache on disk, keyed to the gazetteer contents, so later runs and new
+    chunks only pay for spellings never seen before. Frames are resolved
+    on their distinct values, never per row.
+    
+    Parameters
+    ----------
+    gazetteer_path : str, optional
+        Canonical names CSV (default: data.external.gazetteer in config.yaml)
+    cache_path : str, optional
+        Resolution cache file (default: data.processed.resolution_cache);
+        pass False to keep the cache in memory only
+    min_similarity : float
+        Minimum edit-distance ratio of a fuzzy match
+    """
+    
+    def __init__(self, gazetteer_path=None, cache_path=None, min_similarity=MIN_SIMILARITY):
+        data_config = load_config().get('data', {})
+        if gazetteer_path is None:
+            gazetteer_path = data_config.get('external', {}).get('gazetteer', DEFAULT_GAZETTEER_PATH)
+        if cache_path is None:
+            cache_path = data_config.get('processed', {}).get('resolution_cache', DEFAULT_RESOLUTION_CACHE)
+        
+        self.gazetteer_path = Path(gazetteer_path)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.min_similarity = min_similarity
+        self.stats = Counter()
+        
+        self._load_gazetteer()
+        self._load_cache()
+    
+    def _load_gazetteer(self):
+        states = {name: name for name in STATE_NAME_MAP.values()}
+        districts = defaultdict(dict)
+        
+        if self.gazetteer_path.exists():
+            gazetteer = pd.read_csv(self.gazetteer_path, dtype=str).dropna(subset=['state'])
+            for state in gazetteer['state'].unique():
+                states[state] = state
+            if 'district' in gazetteer.columns:
+                gazetteer = gazetteer.dropna(subset=['district'])
+                for state, district in gazetteer[['state', 'district']].itertuples(index=False):
+                    districts[state][district] = district
+                if 'alias' in gazetteer.columns:
+                    aliases = gazetteer.dropna(subset=['alias'])
+                    for state, district, alias in aliases[['state', 'district', 'alias']].itertuples(index=False):
+                        districts[state][alias] = district
+        else:
+            logger.warning(f"Gazetteer not found at {self.gazetteer_path}; "
+                           "districts will only be cleaned, not resolved")
+        
+        # Known variants resolve like the canonical names they map to
+        states.update(STATE_NAME_MAP)
+        self.state_index = NgramIndex(states)
+        self.district_indexes = {state: NgramIndex(names) for state, names in districts.items()}
+        self.gazetteer_fingerprint = _file_fingerprint(self.gazetteer_path)
+    
+    def _load_cache(self):
+        self._cache = {'state': {}, 'district': {}}
+        self._dirty = False
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        
+        with open(self.cache_path, encoding='utf-8') as f:
+            stored = json.load(f)
+        
+        # Resolutions against another gazetteer (or threshold) are stale
+        if (stored.get('gazetteer') == self.gazetteer_fingerprint
+                and stored.get('min_similarity') == self.min_similarity):
+            self._cache['state'] = stored.get('state', {})
+            self._cache['district'] = stored.get('district', {})
+    
+    def save(self):
+        """Write the resolution cache if anything new was resolved."""
+        if self.cache_path is None or not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'gazetteer': self.gazetteer_fingerprint,
+                'min_similarity': self.min_similarity,
+                'state': self._cache['state'],
+                'district': self._cache['district'],
+            }, f, ensure_ascii=False, indent=1, sort_keys=True)
+        tmp.replace(self.cache_path)
+        self._dirty = False
+    
+    def _resolve(self, kind, cache_key, name, index, fallback):
+        cache = self._cache[kind]
+        if cache_key in cache:
+            self.stats['cached'] += 1
+            return cache[cache_key]
+        
+        canonical, how = index.match(name, self.min_similarity) if index is not None else (None, None)
+        if canonical is None:
+            canonical, how = fallback(name), 'unresolved'
+        self.stats[how] += 1
+        
+        cache[cache_key] = canonical
+        self._dirty = True
+        return canonical
+    
+    def resolve_state(self, name):
+        """Canonical state name of one raw spelling."""
+        if not isinstance(name, str):
+            return name
+        return self._resolve('state', name, name, self.state_index, standardize_state_name)
+    
+    def resolve_district(self, state, name):
+        """Canonical district name of one raw spelling within a (canonical) state."""
+        if not isinstance(name, str):
+            return name
+        return self._resolve(
+            'district', f'{state}|{name}', name, self.district_indexes.get(state),
+            lambda raw: raw.strip().title()
+        )
+    
+    def resolve_frame(self, df, state_col='state', district_col='district', inplace=False, save=True):
+        """
+        Resolve the state and district columns of a frame.
+        
+        States are resolved per distinct value and districts per distinct
+        (state, district) pair; both columns come back categorical.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Frame with raw names
+        state_col, district_col : str
+            Name columns (a missing district column is skipped)
+        inplace : bool
+            Replace the columns on df itself instead of on a copy
+        save : bool
+            Write newly resolved spellings to the cache file
+            
+        Returns
+        -------
+        pd.DataFrame
+            Frame with canonical names (df itself when inplace=True)
+        """
+        if not inplace:
+            df = df.copy()
+        
+        df[state_col] = _map_unique(df[state_col], self.resolve_state)
+        
+        if district_col in df.columns:
+            states = df[state_col]
+            districts = df[district_col]
+            if not isinstance(districts.dtype, pd.CategoricalDtype):
+                districts = districts.astype('category')
+            
+            # Distinct (state, district) pairs from the two code columns
+            state_codes = states.cat.codes.to_numpy().astype(np.int64)
+            district_codes = districts.cat.codes.to_numpy().astype(np.int64)
+            n_districts = len(districts.cat.categories) + 1
+            pair_codes, pairs = pd.factorize((state_codes + 1) * n_districts + district_codes + 1)
+            
+            state_names = np.append(states.cat.categories.to_numpy(dtype=object), None)
+            district_names = np.append(districts.cat.categories.to_numpy(dtype=object), None)
+            resolved = pd.Index([
+                self.resolve_district(state_names[p // n_districts - 1], district_names[p % n_districts - 1])
+                for p in pairs
+            ], dtype=object)
+            df[district_col] = _recode(pair_codes, resolved, df[district_col])
+        
+        if save:
+            self.save()
+        return df
+
+
+def build_gazetteer(df, path=None, state_col='state', district_col='district'):
+    """
+    Write a starting gazetteer from (state-standardized) data.
+    
+    Spellings sharing a normalized key within a state are grouped and the
+    most frequent one is kept as canonical. The file is meant as a base for
+    hand curation; NameResolver reads it as-is.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame with state and district columns
+    path : str, optional
+        Output CSV (default: the configured gazetteer path)
+        
+    Returns
+    -------
+    pd.DataFrame
+        The gazetteer written, sorted by state and district
+    """
+    if path is None:
+        path = load_config().get('data', {}).get('external', {}).get('gazetteer', DEFAULT_GAZETTEER_PATH)
+    
+    counts = df.groupby([state_col, district_col], observed=True).size().reset_index(name='rows')
+    counts[district_col] = counts[district_col].astype(str).str.split().str.join(' ')
+    counts['key'] = counts[district_col].map(normalize_name)
+    counts = counts.groupby([state_col, 'key', district_col], observed=True)['rows'].sum().reset_index()
+    
+    gazetteer = (
+        counts.sort_values('rows', ascending=False)
+        .drop_duplicates([state_col, 'key'])
+        [[state_col, district_col]]
+        .rename(columns={state_col: 'state', district_col: 'district'})
+        .sort_values(['state', 'district'])
+        .reset_index(drop=True)
+    )
+    
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    gazetteer.to_csv(path, index=False)
+    return gazetteer
@@ -8,8 +8,14 @@ import pandas as pd
 import numpy as np
 from typing import Union, List, Optional
 import logging
+from contextlib import contextmanager
 from functools import wraps
+from pathlib import Path
+import json
+import os
+import threading
 import time
+import tracemalloc
 
 # =============================================================================
 # LOGGING CONFIGURATION
@@ -53,6 +59,38 @@ def setup_logger(name: str = 'uidai', level: int = logging.INFO) -> logging.Logg
 logger = setup_logger()
 
 
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# config.yaml at the project root
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config.yaml'
+
+
+def load_config(path: Optional[str] = None) -> dict:
+    """
+    Load the project configuration.
+    
+    Parameters:
+    -----------
+    path : str, optional
+        Path to a YAML config file. Defaults to the project's config.yaml.
+    
+    Returns:
+    --------
+    dict : Parsed configuration (empty if the file does not exist)
+    """
+    import yaml
+    
+    config_path = Path(path) if path is not None else CONFIG_PATH
+    if not config_path.exists():
+        logger.warning(f"Config not found: {config_path}")
+        return {}
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
 # =============================================================================
 # NUMBER FORMATTING
 # =============================================================================
@@ -261,24 +299,331 @@ def categorize_risk(score: float,
         return 'Optimal'
 
 
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+class SpanRecord:
+    """
+    One timed span: wall and CPU time, rows in/out and peak memory delta.
+    
+    Set ``rows_in`` / ``rows_out`` (or add entries to ``args``) on the
+    object yielded by span() to annotate it.
+    """
+    
+    __slots__ = ('name', 'category', 'depth', 'parent', 'thread', 'start', 'wall',
+                 'cpu', 'child_wall', 'rows_in', 'rows_out', 'mem_start', 'mem_peak',
+                 'mem_peak_delta', 'args', '_cpu_start')
+    
+    def __init__(self, name: str, category: str, rows_in: Optional[int] = None):
+        self.name = name
+        self.category = category
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.child_wall = 0.0
+        self.mem_peak_delta = None
+        self.args = {}
+
+
+class _NullSpan:
+    """Stand-in yielded while profiling is off; attribute writes are dropped."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def __setattr__(self, name, value):
+        pass
+    
+    @property
+    def args(self) -> dict:
+        return {}
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _row_count(value) -> Optional[int]:
+    """Rows of a DataFrame/Series, or of the frames in a dict/list/tuple."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        counts = [len(v) for v in value if isinstance(v, (pd.DataFrame, pd.Series))]
+        return sum(counts) if counts else None
+    return None
+
+
+class Profiler:
+    """
+    Hierarchical span profiler.
+    
+    Spans nest per thread. Each records wall time (perf_counter), CPU time
+    of its thread, optional row counts and, with trace_memory, the peak
+    memory it allocated above its starting point (tracemalloc). Results
+    go to a Chrome-trace JSON file (chrome://tracing or ui.perfetto.dev)
+    and a per-name summary table.
+    
+    tracemalloc peaks are process-wide, so spans running concurrently in
+    other threads share them, and tracing slows allocation-heavy Python
+    code noticeably; enable(trace_memory=False) for timings only. Spans
+    in worker processes are not collected.
+    
+    While disabled, span() returns a shared no-op context and profiled()
+    functions make one attribute check before calling through.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self._owns_tracemalloc = False
+        self.records = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def enable(self, trace_memory: bool = True):
+        """Start recording spans (and tracing allocations with trace_memory)."""
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self.enabled = True
+    
+    def disable(self):
+        """
+        Stop recording; recorded spans are kept until reset().
+        
+        tracemalloc is stopped only if enable() started it, so a tracing
+        session begun elsewhere (e.g. python -X tracemalloc) keeps running.
+        """
+        self.enabled = False
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracemalloc = False
+    
+    def reset(self):
+        """Drop all recorded spans."""
+        with self._lock:
+            self.records = []
+            self._origin = time.perf_counter()
+    
+    @contextmanager
+    def _span(self, name: str, category: str, rows_in: Optional[int]):
+        record = SpanRecord(name, category, rows_in)
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        record.depth = len(stack)
+        record.parent = parent.name if parent is not None else None
+        record.thread = threading.get_ident()
+        
+        if self.trace_memory and tracemalloc.is_tracing():
+            # Fold the peak so far into the parent, then measure from here
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None and parent.mem_start is not None:
+                parent.mem_peak = max(parent.mem_peak, peak)
+            tracemalloc.reset_peak()
+            record.mem_start = record.mem_peak = current
+        else:
+            record.mem_start = record.mem_peak = None
+        
+        stack.append(record)
+        record._cpu_start = time.thread_time()
+        record.start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - record.start
+            record.cpu = time.thread_time() - record._cpu_start
+            stack.pop()
+            
+            if record.mem_start is not None and tracemalloc.is_tracing():
+                record.mem_peak = max(record.mem_peak, tracemalloc.get_traced_memory()[1])
+                record.mem_peak_delta = record.mem_peak - record.mem_start
+                if parent is not None and parent.mem_start is not None:
+                    parent.mem_peak = max(parent.mem_peak, record.mem_peak)
+            if parent is not None:
+                parent.child_wall += record.wall
+            
+            with self._lock:
+                self.records.append(record)
+    
+    def span(self, name: str, category: str = '', rows_in: Optional[int] = None):
+        """
+        Context manager recording one span.
+        
+        Parameters:
+        -----------
+        name : str
+            Span name (e.g. the function or step)
+        category : str
+            Grouping shown in the trace viewer (e.g. 'load', 'metric', 'chart')
+        rows_in : int, optional
+            Input rows; set ``rows_out`` on the yielded record
+        
+        Example:
+        --------
+        >>> with PROFILER.span('merge', 'metric', rows_in=len(df)) as s:
+        ...     out = df.merge(other)
+        ...     s.rows_out = len(out)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, rows_in)
+    
+    def profiled(self, func=None, *, name: Optional[str] = None, category: str = ''):
+        """
+        Decorator recording a span per call.
+        
+        Rows in are counted from DataFrame/Series arguments (and dicts or
+        lists of them), rows out from the return value.
+        """
+        if func is None:
+            return lambda f: self.profiled(f, name=name, category=category)
+        
+        span_name = name or func.__name__
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            
+            counts = [c for c in map(_row_count, list(args) + list(kwargs.values())) if c is not None]
+            with self._span(span_name, category, sum(counts) if counts else None) as record:
+                result = func(*args, **kwargs)
+                record.rows_out = _row_count(result)
+            return result
+        return wrapper
+    
+    def to_chrome_trace(self) -> dict:
+        """Recorded spans as Chrome trace events (complete 'X' events, microseconds)."""
+        pid = os.getpid()
+        events = []
+        for r in sorted(self.records, key=lambda r: r.start):
+            args = {'cpu_ms': round(r.cpu * 1000, 3)}
+            if r.rows_in is not None:
+                args['rows_in'] = r.rows_in
+            if r.rows_out is not None:
+                args['rows_out'] = r.rows_out
+            if r.mem_peak_delta is not None:
+                args['mem_peak_delta_kb'] = round(r.mem_peak_delta / 1024, 1)
+            args.update(r.args)
+            events.append({
+                'name': r.name,
+                'cat': r.category or 'default',
+                'ph': 'X',
+                'ts': round((r.start - self._origin) * 1e6, 3),
+                'dur': round(r.wall * 1e6, 3),
+                'pid': pid,
+                'tid': r.thread,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    
+    def write_chrome_trace(self, path: str) -> str:
+        """Write the trace JSON for chrome://tracing or ui.perfetto.dev."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+        logger.info(f"💾 Saved trace: {path} ({len(self.records)} spans)")
+        return path
+    
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-name totals of the recorded spans.
+        
+        Returns:
+        --------
+        pd.DataFrame : calls, wall_s, self_s (wall minus child spans),
+        cpu_s, rows_in, rows_out and the largest mem_peak_mb, by wall_s
+        """
+        columns = ['name', 'category', 'calls', 'wall_s', 'self_s', 'cpu_s',
+                   'rows_in', 'rows_out', 'mem_peak_mb']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        
+        spans = pd.DataFrame({
+            'name': [r.name for r in self.records],
+            'category': [r.category for r in self.records],
+            'wall_s': [r.wall for r in self.records],
+            'self_s': [r.wall - r.child_wall for r in self.records],
+            'cpu_s': [r.cpu for r in self.records],
+            'rows_in': pd.array([r.rows_in for r in self.records], dtype='Int64'),
+            'rows_out': pd.array([r.rows_out for r in self.records], dtype='Int64'),
+            'mem_peak_mb': [np.nan if r.mem_peak_delta is None else r.mem_peak_delta / 1024 ** 2
+                            for r in self.records],
+        })
+        result = spans.groupby(['name', 'category'], sort=False).agg(
+            calls=('wall_s', 'size'),
+            wall_s=('wall_s', 'sum'),
+            self_s=('self_s', 'sum'),
+            cpu_s=('cpu_s', 'sum'),
+            rows_in=('rows_in', lambda rows: rows.sum(min_count=1)),
+            rows_out=('rows_out', lambda rows: rows.sum(min_count=1)),
+            mem_peak_mb=('mem_peak_mb', 'max'),
+        ).reset_index()
+        return result[columns].sort_values('wall_s', ascending=False).reset_index(drop=True)
+    
+    def print_summary(self, top: int = 20):
+        """Print the summary table."""
+        table = self.summary().head(top)
+        print("\n" + "=" * 60)
+        print("⏱️  PROFILE SUMMARY")
+        print("=" * 60)
+        print(table.to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+
+
+# Shared profiler behind span() and profiled(); off until enabled
+PROFILER = Profiler()
+span = PROFILER.span
+profiled = PROFILER.profiled
+
+
+def enable_profiling(trace_memory: bool = True) -> Profiler:
+    """Turn on span recording (with tracemalloc peaks unless trace_memory=False)."""
+    PROFILER.enable(trace_memory)
+    return PROFILER
+
+
+def disable_profiling() -> Profiler:
+    """Turn span recording off; recorded spans stay available."""
+    PROFILER.disable()
+    return PROFILER
+
+
 # =============================================================================
 # DECORATORS
 # =============================================================================
 
 def timer(func):
-    """Decorator to time function execution."""
+    """Decorator to time function execution (also recorded as a span)."""
+    func = profiled(func)
+    
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter()
         result = func(*args, **kwargs)
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
         logger.info(f"⏱️ {func.__name__} completed in {elapsed:.2f}s")
         return result
     return wrapper
 
 
 def log_call(func):
-    """Decorator to log function calls."""
+    """Decorator to log function calls (also recorded as a span)."""
+    func = profiled(func)
+    
     @wraps(func)
     def wrapper(*args, **kwargs):
         logger.info(f"📊 Running: {func.__name__}")
@@ -309,21 +654,210 @@ REGION_MAPPING = {
 }
 
 
-def get_region(state: str) -> str:
-    """Get region for a state."""
-    state_normalized = state.strip().title()
+# Region labels in sorted order, as astype('category') would give them
+REGION_LABELS = sorted(list(REGION_MAPPING) + ['Other'])
+OTHER_REGION = REGION_LABELS.index('Other')
+
+# Pincode prefix lengths of the learned tables (longest match wins)
+PINCODE_PREFIX_DIGITS = (3, 2, 1)
+
+
+class RegionIndex:
+    """
+    Inverted name -> region index for states, districts and pincode prefixes.
+    
+    Regions are integer codes into REGION_LABELS. States are indexed from
+    REGION_MAPPING on construction. Districts and pincode prefixes have no
+    static source, so their regions are learned from frames that carry a
+    state column (learn()): each district name and 1-, 2- and 3-digit
+    pincode prefix goes to the region holding most of its rows. Pincodes
+    then resolve by their longest learned prefix through a dense table, so
+    a lookup is one array take.
+    
+    Columns are resolved per category (or distinct value) and mapped back
+    through the codes; nothing is evaluated per row.
+    """
     
-    for region, states in REGION_MAPPING.items():
-        if state_normalized in states:
-            return region
+    def __init__(self, mapping: dict = REGION_MAPPING):
+        self.state_codes = {
+            state: REGION_LABELS.index(region)
+            for region, states in mapping.items() for state in states
+        }
+        self.district_counts = {}
+        self.prefix_counts = {
+            digits: np.zeros((10 ** digits, len(REGION_LABELS)), dtype=np.int64)
+            for digits in PINCODE_PREFIX_DIGITS
+        }
+        self._pincode_table = None
+    
+    # -- single lookups ---------------------------------------------------
+    
+    def state_region(self, state) -> int:
+        """Region code of a state name ('Other' when unknown, -1 when missing)."""
+        if not isinstance(state, str):
+            return -1
+        return self.state_codes.get(state.strip().title(), OTHER_REGION)
+    
+    def district_region(self, district) -> int:
+        """Region code of a learned district name ('Other' when unseen, -1 when missing)."""
+        if not isinstance(district, str):
+            return -1
+        counts = self.district_counts.get(district.strip().title())
+        return OTHER_REGION if counts is None else int(np.argmax(counts))
+    
+    # -- learning ---------------------------------------------------------
+    
+    def learn(self, df: pd.DataFrame, state_col: str = 'state',
+              district_col: Optional[str] = 'district',
+              pincode_col: Optional[str] = 'pincode') -> 'RegionIndex':
+        """
+        Learn district and pincode-prefix regions from a frame with states.
+        
+        Counts are additive, so chunks can be learned one at a time.
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Frame with a state column and district and/or pincode columns
+        state_col, district_col, pincode_col : str
+            Column names (columns not present are skipped)
+        
+        Returns:
+        --------
+        RegionIndex : self
+        """
+        regions = self.codes(df[state_col], 'state')
+        known = regions >= 0
+        
+        if district_col and district_col in df.columns:
+            names = df[district_col]
+            codes, uniques = (
+                (names.cat.codes.to_numpy(), names.cat.categories)
+                if isinstance(names.dtype, pd.CategoricalDtype) else pd.factorize(names)
+            )
+            valid = known & (codes >= 0)
+            pair_counts = np.bincount(
+                codes[valid].astype(np.int64) * len(REGION_LABELS) + regions[valid],
+                minlength=len(uniques) * len(REGION_LABELS)
+            ).reshape(len(uniques), len(REGION_LABELS))
+            for name, counts in zip(uniques, pair_counts):
+                if counts.any():
+                    key = str(name).strip().title()
+                    self.district_counts[key] = self.district_counts.get(key, 0) + counts
+        
+        if pincode_col and pincode_col in df.columns:
+            pincodes = _pincode_numbers(df[pincode_col])
+            valid = known & (pincodes >= 0)
+            for digits, table in self.prefix_counts.items():
+                prefixes = pincodes[valid] // 10 ** (6 - digits)
+                table += np.bincount(
+                    prefixes * len(REGION_LABELS) + regions[valid],
+                    minlength=table.size
+                ).reshape(table.shape)
+            self._pincode_table = None
+        
+        return self
+    
+    def _pincode_regions(self) -> np.ndarray:
+        """Dense 3-digit prefix -> region table, falling back to shorter prefixes."""
+        if self._pincode_table is None:
+            table = np.full(1000, OTHER_REGION, dtype=np.int64)
+            for digits in sorted(PINCODE_PREFIX_DIGITS):
+                counts = self.prefix_counts[digits]
+                learned = counts.any(axis=1)
+                best = np.where(learned, counts.argmax(axis=1), -1)
+                # Spread each shorter prefix over the 3-digit prefixes it covers
+                best = np.repeat(best, 10 ** (3 - digits))
+                table = np.where(best >= 0, best, table)
+            self._pincode_table = table
+        return self._pincode_table
+    
+    # -- vectorized lookups ------------------------------------------------
+    
+    def codes(self, values: pd.Series, kind: str = 'state') -> np.ndarray:
+        """
+        Region codes of a column of states, districts or pincodes.
+        
+        Parameters:
+        -----------
+        values : pd.Series
+            State or district names (any dtype; categoricals are free), or
+            pincodes (integers or zero-padded strings)
+        kind : str
+            'state', 'district' or 'pincode'
+        
+        Returns:
+        --------
+        np.ndarray : int64 codes into REGION_LABELS, -1 for missing values
+        """
+        if kind == 'pincode':
+            pincodes = _pincode_numbers(values)
+            table = np.append(self._pincode_regions(), -1)
+            return table[np.where(pincodes >= 0, pincodes // 1000, -1)]
+        
+        if kind == 'state':
+            lookup = self.state_region
+        elif kind == 'district':
+            lookup = self.district_region
+        else:
+            raise ValueError(f"Unknown region lookup: {kind}. Choose from 'state', 'district', 'pincode'")
+        
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+        
+        # Trailing -1 entry keeps missing values missing
+        table = np.array([lookup(v) for v in uniques] + [-1], dtype=np.int64)
+        return table[codes]
     
-    return 'Other'
+    def regions(self, values: pd.Series, kind: str = 'state') -> pd.Categorical:
+        """Region labels of a column as a categorical over REGION_LABELS."""
+        return pd.Categorical.from_codes(self.codes(values, kind), categories=REGION_LABELS)
+
+
+def _pincode_numbers(values: pd.Series) -> np.ndarray:
+    """Pincodes as int64 (-1 for missing or non-numeric ones)."""
+    if not pd.api.types.is_integer_dtype(values):
+        values = pd.to_numeric(values, errors='coerce')
+    numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (numbers >= 0) & (numbers < 1_000_000)
+    return np.where(valid, numbers, -1).astype(np.int64)
+
 
+# Shared index, built once at import; learn() districts and pincodes into it
+REGION_INDEX = RegionIndex()
 
-def add_region_column(df: pd.DataFrame, state_col: str = 'state') -> pd.DataFrame:
-    """Add region column to DataFrame based on state."""
-    df = df.copy()
-    df['region'] = df[state_col].apply(get_region)
+
+def get_region(state: str) -> Optional[str]:
+    """Get region for a state (None when the state is missing)."""
+    code = REGION_INDEX.state_region(state)
+    return REGION_LABELS[code] if code >= 0 else None
+
+
+def add_region_column(df: pd.DataFrame, state_col: str = 'state',
+                      by: str = 'state', inplace: bool = False) -> pd.DataFrame:
+    """
+    Add a categorical region column to a DataFrame.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+    state_col : str
+        Column to look up (state, district or pincode column)
+    by : str
+        What the column holds: 'state', 'district' or 'pincode'
+        (the latter two need REGION_INDEX.learn() first)
+    inplace : bool
+        Add the column to df itself instead of to a copy
+    
+    Returns:
+    --------
+    pd.DataFrame : df with a 'region' column (df itself when inplace=True)
+    """
+    if not inplace:
+        df = df.copy()
+    df['region'] = REGION_INDEX.regions(df[state_col], by)
     return df
 
 
@@ -12,6 +12,9 @@ from typing import Optional, List, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+from .data_loader import parse_dates, calendar_feature
+from .utils import profiled
+
 # Set default style
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_palette("husl")
@@ -49,6 +52,14 @@ def set_plot_style():
     plt.rcParams['figure.dpi'] = 100
 
 
+def _weekday(df: pd.DataFrame) -> pd.Series:
+    """Weekday names of the rows, reusing a weekday column if present; df is not modified."""
+    if 'weekday' in df.columns:
+        return df['weekday']
+    return calendar_feature(parse_dates(df['date']), 'weekday')
+
+
+@profiled(category='chart')
 def plot_state_distribution(df: pd.DataFrame, 
                             value_col: str, 
                             title: str,
@@ -75,7 +86,7 @@ def plot_state_distribution(df: pd.DataFrame,
     """
     set_plot_style()
     
-    state_data = df.groupby('state')[value_col].sum().sort_values(ascending=True).tail(top_n)
+    state_data = df.groupby('state', observed=True)[value_col].sum().sort_values(ascending=True).tail(top_n)
     
     fig, ax = plt.subplots(figsize=figsize)
     
@@ -103,6 +114,7 @@ def plot_state_distribution(df: pd.DataFrame,
     plt.show()
 
 
+@profiled(category='chart')
 def plot_age_distribution(df: pd.DataFrame,
                          age_columns: List[str],
                          labels: List[str],
@@ -151,6 +163,7 @@ def plot_age_distribution(df: pd.DataFrame,
     plt.show()
 
 
+@profiled(category='chart')
 def plot_time_series(df: pd.DataFrame,
                      value_col: str,
                      title: str,
@@ -186,6 +199,7 @@ def plot_time_series(df: pd.DataFrame,
     plt.show()
 
 
+@profiled(category='chart')
 def plot_heatmap(df: pd.DataFrame,
                  row_col: str,
                  col_col: str,
@@ -202,7 +216,8 @@ def plot_heatmap(df: pd.DataFrame,
         values=value_col, 
         index=row_col, 
         columns=col_col, 
-        aggfunc='sum'
+        aggfunc='sum',
+        observed=True
     ).fillna(0)
     
     fig, ax = plt.subplots(figsize=figsize)
@@ -226,6 +241,7 @@ def plot_heatmap(df: pd.DataFrame,
     plt.show()
 
 
+@profiled(category='chart')
 def plot_weekday_comparison(df: pd.DataFrame,
                             value_col: str,
                             title: str,
@@ -237,7 +253,7 @@ def plot_weekday_comparison(df: pd.DataFrame,
     set_plot_style()
     
     weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekday_data = df.groupby('weekday')[value_col].sum().reindex(weekday_order)
+    weekday_data = df.groupby(_weekday(df))[value_col].sum().reindex(weekday_order)
     
     fig, ax = plt.subplots(figsize=figsize)
     
@@ -267,6 +283,7 @@ def plot_weekday_comparison(df: pd.DataFrame,
     plt.show()
 
 
+@profiled(category='chart')
 def plot_comparison_bars(data_dict: dict,
                          title: str,
                          xlabel: str = 'Category',
@@ -308,6 +325,7 @@ def plot_comparison_bars(data_dict: dict,
     plt.show()
 
 
+@profiled(category='chart')
 def create_summary_dashboard(enrolment_df: pd.DataFrame,
                              demographic_df: pd.DataFrame,
                              biometric_df: pd.DataFrame,
@@ -352,7 +370,7 @@ def create_summary_dashboard(enrolment_df: pd.DataFrame,
     # 3. Top 10 states (Enrolment)
     ax3 = axes[0, 2]
     if 'total_enrolments' in enrolment_df.columns:
-        top_states = enrolment_df.groupby('state')['total_enrolments'].sum().nlargest(10)
+        top_states = enrolment_df.groupby('state', observed=True)['total_enrolments'].sum().nlargest(10)
         ax3.barh(top_states.index, top_states.values, color=plt.cm.viridis(np.linspace(0.2, 0.8, 10)))
     ax3.set_title('Top 10 States by Enrolment', fontweight='bold')
     ax3.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: format(int(x), ',')))
@@ -368,9 +386,9 @@ def create_summary_dashboard(enrolment_df: pd.DataFrame,
     
     # 5. Weekday comparison
     ax5 = axes[1, 1]
-    if 'weekday' in enrolment_df.columns and 'total_enrolments' in enrolment_df.columns:
+    if ({'weekday', 'date'} & set(enrolment_df.columns)) and 'total_enrolments' in enrolment_df.columns:
         weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekday_data = enrolment_df.groupby('weekday')['total_enrolments'].sum()
+        weekday_data = enrolment_df.groupby(_weekday(enrolment_df))['total_enrolments'].sum()
         weekday_data = weekday_data.reindex(weekday_order)
         colors = ['#4ecdc4' if day in ['Saturday', 'Sunday'] else '#45b7d1' for day in weekday_order]
         ax5.bar(range(7), weekday_data.values, color=colors)